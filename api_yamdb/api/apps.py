@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from .v1 import authentication  # noqa: F401
+        from .v1 import autocomplete, cache, filters  # noqa: F401
+        cache.check_shared_backend()
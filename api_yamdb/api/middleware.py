@@ -0,0 +1,109 @@
+"""Контроль числа SQL-запросов на один запрос к API.
+
+Вьюсет объявляет `query_budget`: число для всех действий или словарь
+`{действие: число}` (для `APIView` ключи - HTTP-методы в нижнем регистре).
+Действия без бюджета не проверяются. При превышении в строгом режиме
+(`QUERY_BUDGET_STRICT`, по умолчанию равен `DEBUG`) бросается
+`QueryBudgetExceeded`, иначе пишется предупреждение в лог `api.query_budget`
+с отпечатками запросов. Потоковые ответы не проверяются: их запросы
+выполняются уже после выхода из middleware. Ответы 5xx тоже не проверяются:
+отчёт об ошибке сам выполняет запросы (печатает QuerySet из локальных
+переменных) и не должен подменяться превышением бюджета.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api.query_budget')
+
+FINGERPRINT_LIMIT = 5
+PLACEHOLDERS = re.compile(r'%s(?:\s*,\s*%s)+')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос к API выполнил больше SQL-запросов, чем разрешено."""
+
+
+def fingerprint(sql):
+    """SQL без значений: списки параметров и литералы сворачиваются."""
+    sql = PLACEHOLDERS.sub('%s, ...', sql)
+    return SPACES.sub(' ', LITERALS.sub('?', sql)).strip()
+
+
+def get_query_budget(view_func, method):
+    """Бюджет для обработчика из `process_view` и HTTP-метода."""
+    budget = getattr(getattr(view_func, 'cls', None), 'query_budget', None)
+    if isinstance(budget, dict):
+        method = method.lower()
+        actions = getattr(view_func, 'actions', None) or {}
+        return budget.get(actions.get(method, method))
+    return budget
+
+
+class QueryCounter:
+    """Обёртка `execute_wrapper`: считает запросы и время в БД."""
+
+    def __init__(self):
+        self.queries = Counter()
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.queries[fingerprint(sql)] += 1
+
+    @property
+    def count(self):
+        return sum(self.queries.values())
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if (budget is not None and counter.count > budget
+                and not response.streaming
+                and response.status_code < 500):
+            self.report(request, counter, budget)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+    def report(self, request, counter, budget):
+        top = counter.queries.most_common(FINGERPRINT_LIMIT)
+        if getattr(settings, 'QUERY_BUDGET_STRICT', settings.DEBUG):
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path}: {counter.count} SQL-'
+                f'запросов при бюджете {budget}. Частые запросы:\n'
+                + '\n'.join(f'{count} × {sql}' for sql, count in top))
+        logger.warning(
+            'Query budget exceeded: %s %s, %d queries, budget %d',
+            request.method, request.path, counter.count, budget,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'queries': counter.count,
+                'query_budget': budget,
+                'db_time_ms': round(counter.duration * 1000, 2),
+                'fingerprints': [
+                    {'sql': sql, 'count': count} for sql, count in top],
+            })
@@ -0,0 +1,156 @@
+"""JWT-аутентификация без запроса пользователя к БД.
+
+Поля, нужные для проверок прав (`USER_CLAIMS`), хранятся в кэше по id
+пользователя. По ним собирается экземпляр `User` с отложенной загрузкой
+остальных полей: права и подстановка автора работают без запросов, а
+обращение к прочим полям (email, bio) догружает их из БД.
+
+При каждом сохранении или удалении пользователя его состояние в кэше
+перезаписывается, импорт пользователей сбрасывает состояния. Записи живут
+`STATE_TIMEOUT` секунд: изменения в обход сигналов (`update()`, правка
+БД вручную) и кэш, не общий для процессов, действуют не дольше этого.
+Если записи в кэше нет, состояние читается из БД: токен может пережить
+смену роли или удаление, поэтому поля токена для проверок прав не
+используются. Они кладутся в токен для клиентов (`ConfirmationView`).
+"""
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken, TokenError)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.signals import rows_imported
+
+User = get_user_model()
+
+USER_CLAIMS = ('username', 'role', 'is_superuser', 'is_staff', 'is_active')
+STATE_TIMEOUT = 30
+DELETED = 'deleted'
+
+
+def user_state_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_user_state(user):
+    return {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+
+def access_token_for(user):
+    """Access-токен с полями пользователя для клиента."""
+    token = AccessToken.for_user(user)
+    for claim, value in get_user_state(user).items():
+        token[claim] = value
+    return token
+
+
+class TokenCache:
+    """LRU проверенных токенов: подпись не проверяется повторно."""
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            token = self.tokens.get(raw_token)
+            if token is not None:
+                self.tokens.move_to_end(raw_token)
+        return token
+
+    def add(self, raw_token, token):
+        with self.lock:
+            self.tokens[raw_token] = token
+            if len(self.tokens) > self.size:
+                self.tokens.popitem(last=False)
+
+    def discard(self, raw_token):
+        with self.lock:
+            self.tokens.pop(raw_token, None)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+token_cache = TokenCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Собирает `request.user` из кэша состояний без запроса к БД."""
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.add(raw_token, token)
+            return token
+        try:
+            token.check_exp()
+        except TokenError as error:
+            token_cache.discard(raw_token)
+            raise InvalidToken({'detail': error.args[0]})
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification')
+        state = cache.get(user_state_key(user_id))
+        if state is None:
+            state = self.load_state(user_id)
+        if state == DELETED:
+            raise AuthenticationFailed('User not found',
+                                       code='user_not_found')
+        if not state['is_active']:
+            raise AuthenticationFailed('User is inactive',
+                                       code='user_inactive')
+        # from_db ждёт значения в порядке полей модели.
+        values = {api_settings.USER_ID_FIELD: user_id, **state}
+        field_names = [field.attname for field in User._meta.concrete_fields
+                       if field.attname in values]
+        return User.from_db(router.db_for_read(User), field_names,
+                            [values[name] for name in field_names])
+
+    @staticmethod
+    def load_state(user_id):
+        state = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values(*USER_CLAIMS).first()
+        cache.add(user_state_key(user_id), state or DELETED, STATE_TIMEOUT)
+        return state or DELETED
+
+
+def update_user_state(sender, instance, **kwargs):
+    cache.set(user_state_key(instance.pk), get_user_state(instance),
+              STATE_TIMEOUT)
+
+
+def delete_user_state(sender, instance, **kwargs):
+    cache.set(user_state_key(instance.pk), DELETED, STATE_TIMEOUT)
+
+
+def purge_user_states(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Сбрасывает состояния после импорта пользователей в обход сигналов."""
+    ids = User.objects.using(using).values_list('pk', flat=True).iterator()
+    while True:
+        keys = [user_state_key(user_id) for user_id in islice(ids, 1000)]
+        if not keys:
+            return
+        cache.delete_many(keys)
+
+
+post_save.connect(update_user_state, sender=User)
+post_delete.connect(delete_user_state, sender=User)
+rows_imported.connect(purge_user_states, sender=User)
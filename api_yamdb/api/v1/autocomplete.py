@@ -0,0 +1,209 @@
+"""Индекс автодополнения по названиям в памяти процесса.
+
+Индекс строится лениво при первом запросе, обновляется сигналами при
+записи через ORM и полностью перестраивается раз в `REFRESH_INTERVAL`
+секунд, чтобы подхватить изменения, сделанные другими процессами.
+Перестроение идёт в фоновом потоке, запросы до его окончания отвечают по
+старому индексу; изменения, пришедшие во время перестроения, применяются
+к новому индексу перед заменой.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+
+from reviews.models import Category, Genre, Title
+
+User = get_user_model()
+
+REFRESH_INTERVAL = 300
+MIN_SIMILARITY = 0.3
+MIN_FUZZY_LENGTH = 3
+
+
+def normalize(value):
+    return ' '.join(value.casefold().split())
+
+
+def trigrams(value):
+    padded = f'  {value} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PrefixTrigramIndex:
+    """Поиск по префиксу с откатом на триграммное сходство для опечаток."""
+
+    def __init__(self):
+        self.entries = {}
+        self.keys = []
+        self.postings = defaultdict(set)
+
+    def add(self, key, name, payload):
+        self.remove(key)
+        normalized = normalize(name)
+        grams = trigrams(normalized)
+        self.entries[key] = (normalized, grams, payload)
+        position = bisect_left(self.keys, (normalized, key))
+        self.keys.insert(position, (normalized, key))
+        for gram in grams:
+            self.postings[gram].add(key)
+
+    def remove(self, key):
+        if key not in self.entries:
+            return
+        normalized, grams, _ = self.entries.pop(key)
+        del self.keys[bisect_left(self.keys, (normalized, key))]
+        for gram in grams:
+            self.postings[gram].discard(key)
+
+    def search(self, query, limit):
+        query = normalize(query)
+        found = []
+        position = bisect_left(self.keys, (query,))
+        while (len(found) < limit and position < len(self.keys)
+               and self.keys[position][0].startswith(query)):
+            found.append(self.keys[position][1])
+            position += 1
+        if len(found) < limit and len(query) >= MIN_FUZZY_LENGTH:
+            found.extend(self.similar(query, limit - len(found), found))
+        return [self.entries[key][2] for key in found]
+
+    def similar(self, query, limit, exclude):
+        query_grams = trigrams(query)
+        common = Counter()
+        for gram in query_grams:
+            common.update(self.postings.get(gram, ()))
+        scored = []
+        for key, shared in common.items():
+            if key in exclude:
+                continue
+            total = len(query_grams) + len(self.entries[key][1]) - shared
+            similarity = shared / total
+            if similarity >= MIN_SIMILARITY:
+                scored.append((-similarity, self.entries[key][0], key))
+        scored.sort()
+        return [key for _, _, key in scored[:limit]]
+
+
+class AutocompleteIndex:
+    """Индексы по произведениям, жанрам, категориям и пользователям."""
+    sources = {
+        'titles': (Title, 'name', ('id', 'name')),
+        'genres': (Genre, 'name', ('name', 'slug')),
+        'categories': (Category, 'name', ('name', 'slug')),
+        'users': (User, 'username', ('username',)),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.indexes = None
+        self.built_at = 0
+        self.generation = 0
+        self.refresh_thread = None
+        self.pending = None
+
+    def invalidate(self):
+        with self.lock:
+            self.indexes = None
+            self.generation += 1
+            self.pending = None
+
+    def get_indexes(self):
+        indexes = self.indexes
+        if indexes is None:
+            # Первое построение одно на процесс, остальные запросы ждут его.
+            with self.build_lock:
+                indexes = self.indexes
+                if indexes is None:
+                    indexes = self.build()
+                    with self.lock:
+                        self.indexes = indexes
+                        self.built_at = time.monotonic()
+        elif time.monotonic() - self.built_at > REFRESH_INTERVAL:
+            self.start_refresh()
+        return indexes
+
+    def start_refresh(self):
+        with self.lock:
+            if self.pending is not None:
+                return
+            self.pending = []
+            generation = self.generation
+        self.refresh_thread = threading.Thread(
+            target=self.refresh, args=(generation,), daemon=True)
+        self.refresh_thread.start()
+
+    def refresh(self, generation):
+        indexes = None
+        try:
+            indexes = self.build()
+        finally:
+            connection.close()
+            with self.lock:
+                if indexes is not None and self.generation == generation:
+                    for args in self.pending:
+                        self.apply(indexes, *args)
+                    self.indexes = indexes
+                # При ошибке следующая попытка - через REFRESH_INTERVAL.
+                self.built_at = time.monotonic()
+                self.pending = None
+
+    def build(self):
+        indexes = {}
+        for kind, (model, name_field, fields) in self.sources.items():
+            index = indexes[kind] = PrefixTrigramIndex()
+            columns = dict.fromkeys(('pk', name_field, *fields))
+            for row in model.objects.values(*columns).iterator():
+                index.add(row['pk'], row[name_field],
+                          {field: row[field] for field in fields})
+        return indexes
+
+    def search(self, query, kinds, limit):
+        indexes = self.get_indexes()
+        with self.lock:
+            return {kind: indexes[kind].search(query, limit)
+                    for kind in kinds}
+
+    def update(self, instance, deleted=False):
+        for kind, (model, name_field, fields) in self.sources.items():
+            if isinstance(instance, model):
+                break
+        else:
+            return
+        args = (kind, instance.pk, None if deleted else (
+            getattr(instance, name_field),
+            {field: getattr(instance, field) for field in fields}))
+        with self.lock:
+            if self.indexes is None:
+                return
+            self.apply(self.indexes, *args)
+            if self.pending is not None:
+                self.pending.append(args)
+
+    @staticmethod
+    def apply(indexes, kind, key, entry):
+        if entry is None:
+            indexes[kind].remove(key)
+        else:
+            indexes[kind].add(key, *entry)
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def update_autocomplete_on_save(sender, instance, **kwargs):
+    autocomplete_index.update(instance)
+
+
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    autocomplete_index.update(instance, deleted=True)
+
+
+for source_model, *_ in AutocompleteIndex.sources.values():
+    post_save.connect(update_autocomplete_on_save, sender=source_model)
+    post_delete.connect(update_autocomplete_on_delete, sender=source_model)
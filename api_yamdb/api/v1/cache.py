@@ -0,0 +1,264 @@
+"""Кэш ответов на чтение с версионированием по ресурсам.
+
+Ключ ответа включает текущие версии всех ресурсов, от которых он зависит.
+Любая запись через ORM (включая каскадное удаление) увеличивает версию
+ресурса, поэтому устаревшие ответы больше не находятся по ключу и просто
+вытесняются по таймауту. Импорт в обход ORM сообщает о записанных моделях
+сигналом `rows_imported`. Для нескольких процессов нужен общий бэкенд кэша.
+
+Те же версии вместе с временем последней записи служат валидаторами
+ETag/Last-Modified: условный GET отвечает 304 до обращения к сериализаторам
+и, для коллекций без водяного знака, без запросов к БД.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, deleting_titles)
+from reviews.signals import rows_imported
+
+User = get_user_model()
+
+RESPONSE_TIMEOUT = 300
+# Область видимости, версия которой входит в ключи всех областей ресурса.
+ALL_SCOPES = '*'
+
+
+def check_shared_backend():
+    """Запрещает кэш в памяти процесса вне DEBUG.
+
+    Версии ресурсов в LocMemCache не видны другим воркерам, и они отдавали
+    бы устаревшие ответы после чужих записей.
+    """
+    backend = import_string(settings.CACHES[DEFAULT_CACHE_ALIAS]['BACKEND'])
+    if issubclass(backend, LocMemCache) and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            'Кэш ответов API требует общего для воркеров бэкенда кэша '
+            '(FileBasedCache, Memcached, Redis), LocMemCache допустим '
+            'только при DEBUG.')
+
+
+def version_key(resource, scope=None):
+    if scope is None:
+        return f'version:{resource}'
+    return f'version:{resource}:{scope}'
+
+
+def modified_key(key):
+    return f'{key}:modified'
+
+
+def initial_version():
+    # Версия, созданная после вытеснения из кэша, больше любой прежней,
+    # поэтому старые ответы не могут совпасть по ключу.
+    return time.time_ns() // 1000
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(resource, scope=None):
+    keys = [version_key(resource)]
+    if scope is not None:
+        keys.append(version_key(resource, scope))
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, initial_version(), None)
+    now = time.time()
+    cache.set_many({modified_key(key): now for key in keys}, None)
+
+
+def get_modified(keys):
+    modified = cache.get_many([modified_key(key) for key in keys])
+    return max(modified.values(), default=None)
+
+
+class CachedListMixin:
+    """Кэширует ответы `list` до изменения данных и отвечает на условный GET.
+
+    `cache_dependencies` - пары (ресурс, kwarg области видимости или None).
+    `get_watermark()` может вернуть агрегаты коллекции из БД (например,
+    последнюю дату публикации), которые добавляются к ключу и валидаторам.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args,
+                                        **kwargs)
+
+    def get_version_keys(self):
+        keys = []
+        for resource, scope in self.cache_dependencies:
+            if scope is not None:
+                keys.append(version_key(resource, ALL_SCOPES))
+            keys.append(version_key(resource, self.kwargs.get(scope)))
+        return keys
+
+    def get_validator(self, request, watermark=None):
+        """Всё, от чего зависит ответ: версии, адрес, роль, водяной знак."""
+        versions = '.'.join(map(str, get_versions(self.get_version_keys())))
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        validator = (f'{versions}:{request.get_host()}'
+                     f'{request.path}?{query}:{self.get_role_class(request)}')
+        if watermark is not None:
+            validator = f'{validator}:{sorted(watermark.items())}'
+        return validator
+
+    def get_watermark(self):
+        return None
+
+    def get_last_modified(self, watermark=None):
+        last_modified = get_modified(self.get_version_keys())
+        if watermark and watermark.get('last_published') is not None:
+            published = watermark['last_published'].timestamp()
+            last_modified = max(last_modified or 0, published)
+        return last_modified
+
+    @staticmethod
+    def get_role_class(request):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return 'anonymous'
+        return 'superuser' if user.is_superuser else user.role
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        watermark = self.get_watermark()
+        # Хэш вместо строки: ключи Memcached не длиннее 250 символов и
+        # без пробелов.
+        digest = hashlib.md5(
+            self.get_validator(request, watermark).encode()).hexdigest()
+        key = f'response:{digest}'
+        etag = f'W/"{digest}"'
+        last_modified = self.get_last_modified(watermark)
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified)
+            last_modified = int(last_modified)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data, status=status.HTTP_200_OK)
+            else:
+                response = handler(request, *args, **kwargs)
+                if (response.status_code != status.HTTP_200_OK
+                        or response.streaming):
+                    return response
+                cache.set(key, response.data, RESPONSE_TIMEOUT)
+        for header, value in headers.items():
+            response[header] = value
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+
+class CachedResponseMixin(CachedListMixin):
+    """Кэширует ответы `list` и `retrieve` до изменения данных."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args,
+                                        **kwargs)
+
+
+def bump_on_category(sender, instance, **kwargs):
+    bump_version('categories')
+    bump_version('titles')
+
+
+def bump_on_genre(sender, instance, **kwargs):
+    bump_version('genres')
+    bump_version('titles')
+
+
+def bump_on_title(sender, instance, **kwargs):
+    bump_version('titles')
+    bump_version('reviews', instance.pk)
+
+
+def bump_on_title_genre(sender, **kwargs):
+    bump_version('titles')
+
+
+def bump_on_review(sender, instance, **kwargs):
+    bump_version('comments', instance.pk)
+    # Списки отзывов и произведений сбросит удаление самого произведения.
+    if instance.title_id not in deleting_titles.ids:
+        bump_version('reviews', instance.title_id)
+        bump_version('titles')
+
+
+def bump_on_comment(sender, instance, **kwargs):
+    bump_version('comments', instance.review_id)
+
+
+def remember_username(sender, instance, **kwargs):
+    # Отложенное поле не загружено и не может измениться без присваивания.
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+def bump_on_user_save(sender, instance, created, **kwargs):
+    # В ответах пользователь виден только по логину, а у нового
+    # пользователя ещё нет отзывов и комментариев.
+    loaded, instance._loaded_username = (
+        instance._loaded_username, instance.username)
+    if not created and instance.username != loaded:
+        bump_version('users')
+
+
+def bump_on_user_delete(sender, instance, **kwargs):
+    bump_version('users')
+
+
+IMPORTED_VERSIONS = {
+    User: (('users', None),),
+    Category: (('categories', None), ('titles', None)),
+    Genre: (('genres', None), ('titles', None)),
+    Title: (('titles', None), ('reviews', ALL_SCOPES)),
+    TitleGenre: (('titles', None),),
+    Review: (('reviews', ALL_SCOPES), ('comments', ALL_SCOPES),
+             ('titles', None)),
+    Comment: (('comments', ALL_SCOPES),),
+}
+
+
+def bump_on_import(sender, **kwargs):
+    # Затронутые области неизвестны, поэтому сбрасываются все области.
+    for resource, scope in IMPORTED_VERSIONS.get(sender, ()):
+        bump_version(resource, scope)
+
+
+for sender, handler in ((Category, bump_on_category),
+                        (Genre, bump_on_genre),
+                        (Title, bump_on_title),
+                        (Title.genre.through, bump_on_title_genre),
+                        (Review, bump_on_review),
+                        (Comment, bump_on_comment)):
+    post_save.connect(handler, sender=sender)
+    post_delete.connect(handler, sender=sender)
+post_init.connect(remember_username, sender=User)
+post_save.connect(bump_on_user_save, sender=User)
+post_delete.connect(bump_on_user_delete, sender=User)
+m2m_changed.connect(bump_on_title_genre, sender=Title.genre.through)
+rows_imported.connect(bump_on_import)
@@ -0,0 +1,81 @@
+"""Выгрузка всего каталога в NDJSON одним запросом.
+
+Произведения читаются итератором пачками по `chunk_size`; жанры, отзывы и
+комментарии подгружаются одним запросом на пачку, поэтому память на
+выгрузку ограничена размером пачки, а не каталога.
+"""
+from collections import defaultdict
+
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Comment, Review, Title
+
+from .readers import CommentsReader, ReviewsReader, TitlesReader
+from .renderers import iter_chunks
+
+INCLUDES = ('reviews', 'comments')
+
+
+def parse_include(value):
+    """Разбирает `?include=reviews,comments`; комментарии требуют отзывов."""
+    names = {name for name in value.split(',') if name}
+    unknown = names.difference(INCLUDES)
+    if unknown:
+        raise ValidationError({'include': [
+            f'Неизвестные значения: {", ".join(sorted(unknown))}. '
+            f'Доступны: {", ".join(INCLUDES)}.'
+        ]})
+    if 'comments' in names:
+        names.add('reviews')
+    return names
+
+
+def group_by(rows, represented, key):
+    grouped = defaultdict(list)
+    for row, item in zip(rows, represented):
+        grouped[row[key]].append(item)
+    return grouped
+
+
+class CatalogExporter:
+    """Итератор по произведениям с категорией, жанрами и рейтингом."""
+    chunk_size = 500
+
+    def __init__(self, include=(), chunk_size=None):
+        self.include = set(include)
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+
+    def __iter__(self):
+        reader = TitlesReader()
+        queryset = Title.objects.select_related('category').order_by('id')
+        for chunk in iter_chunks(reader.rows(queryset), self.chunk_size):
+            titles = reader.represent(chunk)
+            if 'reviews' in self.include:
+                self.attach_reviews(titles)
+            yield from titles
+
+    def attach_reviews(self, titles):
+        reader = ReviewsReader()
+        rows = list(
+            Review.objects.filter(title_id__in=[title['id']
+                                                for title in titles])
+            .order_by('pub_date', 'id')
+            .values(*reader.fields, 'title_id'))
+        reviews = reader.represent(rows)
+        if 'comments' in self.include:
+            self.attach_comments(reviews)
+        grouped = group_by(rows, reviews, 'title_id')
+        for title in titles:
+            title['reviews'] = grouped[title['id']]
+
+    def attach_comments(self, reviews):
+        reader = CommentsReader()
+        rows = list(
+            Comment.objects.filter(review_id__in=[review['id']
+                                                  for review in reviews])
+            .order_by('pub_date', 'id')
+            .values(*reader.fields, 'review_id'))
+        grouped = group_by(rows, reader.represent(rows), 'review_id')
+        for review in reviews:
+            review['comments'] = grouped[review['id']]
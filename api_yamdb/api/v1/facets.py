@@ -0,0 +1,63 @@
+"""Подсчёт фасетов для отфильтрованного списка произведений.
+
+Каждый фасет - один сгруппированный запрос по подзапросу с отобранными
+произведениями, независимо от числа значений фасета.
+"""
+from django.db.models import Count, F
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Title, TitleGenre
+
+
+def genre_facet(titles):
+    return [
+        {'slug': row['genres__slug'], 'count': row['count']}
+        for row in TitleGenre.objects.filter(titles__in=titles)
+        .values('genres__slug')
+        .annotate(count=Count('titles', distinct=True))
+        .order_by('-count', 'genres__slug')
+    ]
+
+
+def category_facet(titles):
+    return [
+        {'slug': row['category__slug'], 'count': row['count']}
+        for row in Title.objects.filter(pk__in=titles)
+        .values('category__slug')
+        .annotate(count=Count('pk'))
+        .order_by('-count', 'category__slug')
+    ]
+
+
+def year_facet(titles):
+    return [
+        {'decade': row['decade'], 'count': row['count']}
+        for row in Title.objects.filter(pk__in=titles)
+        .annotate(decade=F('year') / 10 * 10)
+        .values('decade')
+        .annotate(count=Count('pk'))
+        .order_by('decade')
+    ]
+
+
+FACETS = {
+    'genre': genre_facet,
+    'category': category_facet,
+    'year': year_facet,
+}
+
+
+def parse_facets(value):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = set(names) - set(FACETS)
+    if unknown:
+        raise ValidationError(
+            {'facets': f'Неизвестные фасеты: {", ".join(sorted(unknown))}. '
+                       f'Доступны: {", ".join(FACETS)}.'})
+    return list(dict.fromkeys(names))
+
+
+def count_facets(queryset, names):
+    """Считает фасеты по отфильтрованному queryset произведений."""
+    titles = queryset.order_by().values('pk')
+    return {name: FACETS[name](titles) for name in names}
@@ -1,17 +1,88 @@
-from django_filters import AllValuesFilter, FilterSet
+from functools import partial
 
-from reviews.models import Title
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import post_delete, post_save
+from django_filters import (BaseInFilter, CharFilter, ChoiceFilter,
+                            FilterSet)
+from rest_framework import filters
+
+from reviews import search
+from reviews.models import Category, Genre, Title, TitleGenre
+from reviews.signals import rows_imported
+
+CHOICES_TIMEOUT = 300
+
+
+def choices_cache_key(model):
+    return f'filter-choices:{model._meta.label_lower}'
+
+
+def slug_choices(model):
+    """Список слагов для проверки значения фильтра, кэшируется."""
+    key = choices_cache_key(model)
+    choices = cache.get(key)
+    if choices is None:
+        choices = [(slug, slug) for slug
+                   in model.objects.values_list('slug', flat=True)]
+        cache.set(key, choices, CHOICES_TIMEOUT)
+    return choices
+
+
+def reset_slug_choices(sender, **kwargs):
+    cache.delete(choices_cache_key(sender))
+
+
+for choices_model in (Category, Genre):
+    post_save.connect(reset_slug_choices, sender=choices_model)
+    post_delete.connect(reset_slug_choices, sender=choices_model)
+    rows_imported.connect(reset_slug_choices, sender=choices_model)
+
+
+class SlugFilter(ChoiceFilter):
+    """Точный фильтр по слагу со списком допустимых значений из кэша.
+
+    В отличие от AllValuesFilter список значений читается только при
+    проверке переданного параметра и не требует SELECT DISTINCT.
+    """
+
+    def __init__(self, *args, model, **kwargs):
+        kwargs['choices'] = partial(slug_choices, model)
+        super().__init__(*args, **kwargs)
+
+
+class SlugInFilter(BaseInFilter, SlugFilter):
+    pass
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """Поиск по FTS5-индексу с сортировкой по релевантности.
+
+    Если индекс недоступен (не SQLite), работает как обычный SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not search.is_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        return search.ranked(queryset, terms)
 
 
 class TitlesFilter(FilterSet):
     """Фильтрация для модели Titles"""
 
-    category = AllValuesFilter(field_name='category__slug',
-                               lookup_expr='icontains')
-    genre = AllValuesFilter(field_name='genre__slug',
-                            lookup_expr='icontains')
-    name = AllValuesFilter(lookup_expr='iexact')
+    category = SlugFilter(field_name='category__slug', model=Category)
+    category__in = SlugInFilter(field_name='category__slug', model=Category)
+    genre = SlugFilter(method='filter_genre', model=Genre)
+    genre__in = SlugInFilter(method='filter_genre', model=Genre)
+    name = CharFilter(lookup_expr='iexact')
 
     class Meta:
         model = Title
-        fields = ['category', 'genre', 'name', 'year']
+        fields = {'year': ['exact', 'gte', 'lte']}
+
+    def filter_genre(self, queryset, name, value):
+        """Фильтр по жанру через EXISTS, без дублей от JOIN."""
+        slugs = value if isinstance(value, list) else [value]
+        return queryset.filter(Exists(TitleGenre.objects.filter(
+            titles=OuterRef('pk'), genres__slug__in=slugs)))
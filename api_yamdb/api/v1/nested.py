@@ -0,0 +1,39 @@
+"""Родительские объекты вложенных маршрутов отзывов и комментариев."""
+from django.shortcuts import get_object_or_404
+
+from reviews.models import Review, Title
+
+
+class NestedParentsMixin:
+    """Загружает цепочку `title_id` → `review_id` одним запросом.
+
+    Найденные объекты запоминаются в запросе, поэтому `get_queryset`,
+    `perform_create`, валидация сериализатора и проверки прав получают
+    один и тот же объект без повторных запросов. Отзыв ищется только
+    среди отзывов произведения из URL.
+    """
+
+    def get_parents(self):
+        request = self.request
+        if not hasattr(request, 'nested_parents'):
+            request.nested_parents = {}
+        parents = request.nested_parents
+        key = (self.kwargs.get('title_id'), self.kwargs.get('review_id'))
+        if key not in parents:
+            parents[key] = self.load_parents(*key)
+        return parents[key]
+
+    @staticmethod
+    def load_parents(title_id, review_id):
+        if review_id is None:
+            return get_object_or_404(Title, pk=title_id), None
+        review = get_object_or_404(
+            Review.objects.select_related('title'),
+            pk=review_id, title_id=title_id)
+        return review.title, review
+
+    def get_title(self):
+        return self.get_parents()[0]
+
+    def get_review(self):
+        return self.get_parents()[1]
@@ -0,0 +1,181 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, PageNumberPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу сортировки с непрозрачным курсором.
+
+    Страница выбирается условием на последний показанный ключ, поэтому
+    стоимость запроса не зависит от глубины страницы и не требует COUNT.
+    Порядок задаётся атрибутом `cursor_ordering` вьюсета.
+    """
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(view.cursor_ordering)
+        cursor = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param),
+            queryset.model)
+        self.reverse = cursor is not None and cursor[0]
+        if self.reverse:
+            queryset = queryset.order_by(
+                *(f'-{field}' for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.keyset_filter(cursor[1]))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True, cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def keyset_filter(self, values):
+        """Условие «строго после ключа» для составной сортировки."""
+        lookup = 'lt' if self.reverse else 'gt'
+        conditions = []
+        for position, field in enumerate(self.ordering):
+            equal = dict(zip(self.ordering[:position], values[:position]))
+            conditions.append(
+                Q(**equal, **{f'{field}__{lookup}': values[position]}))
+        return reduce(or_, conditions)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link(self.page[0], reverse=True)
+
+    def get_link(self, item, reverse):
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param)
+        values = [self.get_key_value(item, field) for field in self.ordering]
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(reverse, values))
+
+    @staticmethod
+    def get_key_value(item, field):
+        value = item[field] if isinstance(item, dict) else getattr(item, field)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def encode_cursor(reverse, values):
+        data = json.dumps([int(reverse), values], ensure_ascii=False)
+        return urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, encoded, model):
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            reverse, values = json.loads(urlsafe_b64decode(padded))
+        except (binascii.Error, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [model._meta.get_field(field).to_python(value)
+                      for field, value in zip(self.ordering, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in values:
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), values
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """Постраничная пагинация с переходом на курсор по параметру `cursor`.
+
+    Старые клиенты продолжают получать номера страниц и `count`, а курсорный
+    режим включается передачей `?cursor=` (пустое значение - первая страница).
+    """
+    keyset_class = KeysetPagination
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (self.keyset_class.cursor_query_param in request.query_params
+                and getattr(view, 'cursor_ordering', None)):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_stream_page(self, queryset, request, view=None):
+        """Готовит страницу для потоковой отдачи без загрузки в память.
+
+        Возвращает поля ответа без `results` и ленивый срез queryset.
+        В курсорном режиме возвращает `None`: ссылки на соседние страницы
+        зависят от последней записи, поэтому страница отдаётся целиком.
+        """
+        if (self.keyset_class.cursor_query_param in request.query_params
+                and getattr(view, 'cursor_ordering', None)):
+            return None
+        self.keyset = None
+        self.request = request
+        paginator = self.django_paginator_class(
+            queryset, self.get_page_size(request))
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)))
+        header = {
+            'count': paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        return header, self.page.object_list
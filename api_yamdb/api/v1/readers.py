@@ -0,0 +1,157 @@
+"""Быстрое чтение списков без ModelSerializer.
+
+Читатель строит ответ из словарей `values()`: модели не создаются, а поля
+не проходят через `to_representation` сериализатора. Результат совпадает
+с выводом соответствующего сериализатора байт в байт, это проверяется
+тестами.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from reviews.models import TitleGenre
+
+from .renderers import StreamingJSONRenderer, represent_in_chunks
+
+datetime_field = serializers.DateTimeField()
+
+
+class TitlesReader:
+    """Аналог TitlesGetSerializer для списка и карточки произведения."""
+    fields = ('id', 'name', 'year', 'description', 'rating',
+              'category__name', 'category__slug')
+
+    def rows(self, queryset):
+        return queryset.prefetch_related(None).values(*self.fields)
+
+    def represent(self, rows):
+        rows = list(rows)
+        genres = defaultdict(list)
+        for title_id, name, slug in (
+                TitleGenre.objects
+                .filter(titles_id__in=[row['id'] for row in rows])
+                .order_by('genres__name')
+                .values_list('titles_id', 'genres__name', 'genres__slug')):
+            genres[title_id].append({'name': name, 'slug': slug})
+        return [{
+            'id': row['id'],
+            'category': (
+                {'name': row['category__name'],
+                 'slug': row['category__slug']}
+                if row['category__slug'] is not None else None
+            ),
+            'genre': genres[row['id']],
+            'rating': (round(row['rating'], 1)
+                       if row['rating'] is not None else None),
+            'name': row['name'],
+            'year': row['year'],
+            'description': row['description'],
+        } for row in rows]
+
+
+class ReviewsReader:
+    """Аналог ReviewsSerializer для чтения."""
+    fields = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def rows(self, queryset):
+        return queryset.values(*self.fields)
+
+    def represent(self, rows):
+        to_representation = datetime_field.to_representation
+        return [{
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': to_representation(row['pub_date']),
+        } for row in rows]
+
+
+class CommentsReader:
+    """Аналог CommentsSerializer для чтения."""
+    fields = ('id', 'text', 'author__username', 'pub_date')
+
+    def rows(self, queryset):
+        return queryset.values(*self.fields)
+
+    def represent(self, rows):
+        to_representation = datetime_field.to_representation
+        return [{
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': to_representation(row['pub_date']),
+        } for row in rows]
+
+
+class FastReadMixin:
+    """Отдаёт `list` и `retrieve` через читатель строк `reader_class`.
+
+    Проверка прав на объект пропускается: у вьюсетов с этим миксином она
+    разрешает безопасные методы без обращения к объекту.
+
+    С параметром `?stream=1` страница списка отдаётся потоково: строки
+    читаются итератором пачками по `stream_chunk_size` и отправляются
+    клиенту по мере кодирования.
+    """
+    reader_class = None
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+    stream_renderer_class = StreamingJSONRenderer
+
+    def get_reader(self):
+        return self.reader_class()
+
+    def is_streaming(self, request):
+        value = request.query_params.get(self.stream_query_param, '')
+        return value.lower() in ('1', 'true')
+
+    def get_stream_extra(self, queryset):
+        """Дополнительные поля ответа, отдаваемые перед `results`."""
+        return {}
+
+    def stream_list(self, request):
+        reader = self.get_reader()
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = reader.rows(queryset)
+        header = None
+        if self.paginator is not None:
+            page = self.paginator.get_stream_page(rows, request, view=self)
+            if page is None:
+                return None
+            header, rows = page
+            header.update(self.get_stream_extra(queryset))
+        renderer = self.stream_renderer_class()
+        items = represent_in_chunks(reader, rows, self.stream_chunk_size)
+        return StreamingHttpResponse(
+            renderer.render_page(header, items),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}')
+
+    def list(self, request, *args, **kwargs):
+        if self.is_streaming(request):
+            response = self.stream_list(request)
+            if response is not None:
+                return response
+        reader = self.get_reader()
+        rows = reader.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.represent(page))
+        return Response(reader.represent(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            rows = reader.represent(reader.rows(queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}))[:1])
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound()
+        if not rows:
+            raise NotFound()
+        return Response(rows[0])
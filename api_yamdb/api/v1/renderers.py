@@ -0,0 +1,97 @@
+import json
+from itertools import islice
+
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StreamingJSONRenderer:
+    """Потоковая отдача JSON: элементы кодируются и отправляются пачками.
+
+    Вывод совпадает с JSONRenderer при настройках DRF по умолчанию
+    (компактный JSON, UTF-8, экранирование U+2028/U+2029). Если установлен
+    orjson, он используется для кодирования.
+    """
+    media_type = 'application/json'
+    charset = 'utf-8'
+    buffer_size = 64 * 1024
+
+    @staticmethod
+    def dumps(data):
+        if orjson is not None:
+            content = orjson.dumps(data)
+        else:
+            content = json.dumps(
+                data, cls=encoders.JSONEncoder,
+                ensure_ascii=not api_settings.UNICODE_JSON,
+                allow_nan=not api_settings.STRICT_JSON,
+                separators=(',', ':'),
+            ).encode()
+        return (content.replace(b'\xe2\x80\xa8', b'\\u2028')
+                .replace(b'\xe2\x80\xa9', b'\\u2029'))
+
+    def iter_items(self, items):
+        """Кодирует элементы через запятую, отдавая буфер по заполнении."""
+        buffer, separator = [], b''
+        size = 0
+        for item in items:
+            encoded = self.dumps(item)
+            buffer.append(separator + encoded)
+            separator = b','
+            size += len(encoded) + 1
+            if size >= self.buffer_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b''.join(buffer)
+
+    def render_page(self, header, items):
+        """Отдаёт объект `header` с добавленным списком `results`.
+
+        Без `header` (список без пагинации) отдаётся просто массив.
+        """
+        if header is None:
+            yield b'['
+            yield from self.iter_items(items)
+            yield b']'
+            return
+        if header:
+            yield self.dumps(header)[:-1] + b',"results":['
+        else:
+            yield b'{"results":['
+        yield from self.iter_items(items)
+        yield b']}'
+
+    def render_lines(self, items):
+        """Отдаёт элементы в формате NDJSON, по одному на строку."""
+        buffer, size = [], 0
+        for item in items:
+            encoded = self.dumps(item) + b'\n'
+            buffer.append(encoded)
+            size += len(encoded)
+            if size >= self.buffer_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b''.join(buffer)
+
+
+def iter_chunks(queryset, chunk_size):
+    """Читает queryset итератором и отдаёт списки по `chunk_size` строк."""
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def represent_in_chunks(reader, rows, chunk_size):
+    """Читает строки итератором и представляет их пачками `chunk_size`."""
+    for chunk in iter_chunks(rows, chunk_size):
+        yield from reader.represent(chunk)
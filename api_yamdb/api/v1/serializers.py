@@ -2,8 +2,13 @@ import datetime as dt
 import re
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (MIN_SCORE, Category, Comment, Genre, Review,
+                            ScoreHistogram, Title)
+from reviews.services import upsert_titles
+from users.bloom import user_filters
 
 User = get_user_model()
 
@@ -49,6 +54,78 @@ class TitlesCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class TitlesBulkListSerializer(serializers.ListSerializer):
+    """Список произведений для массовой загрузки.
+
+    Слаги категорий и жанров и id обновляемых произведений проверяются
+    одним запросом на модель; ошибки возвращаются списком по элементам.
+    """
+    max_items = 5000
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.max_items:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    f'Не больше {self.max_items} произведений за запрос.']
+            })
+        return self.resolve(super().to_internal_value(data))
+
+    def resolve(self, attrs):
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in attrs}, field_name='slug')
+        genres = Genre.objects.in_bulk(
+            {slug for item in attrs for slug in item['genre']},
+            field_name='slug')
+        ids = [item['id'] for item in attrs if 'id' in item]
+        existing = set(Title.objects.filter(pk__in=ids).values_list(
+            'pk', flat=True))
+        seen = set()
+        errors = []
+        for item in attrs:
+            item_errors = {}
+            if item['category'] not in categories:
+                item_errors['category'] = [
+                    f'Категории {item["category"]} не существует.']
+            missing = [slug for slug in item['genre'] if slug not in genres]
+            if missing:
+                item_errors['genre'] = [
+                    f'Жанров {", ".join(missing)} не существует.']
+            if 'id' in item:
+                if item['id'] not in existing:
+                    item_errors['id'] = [
+                        f'Произведения {item["id"]} не существует.']
+                elif item['id'] in seen:
+                    item_errors['id'] = ['Произведение указано дважды.']
+                seen.add(item['id'])
+            errors.append(item_errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return [{
+            **item,
+            'category': categories[item['category']],
+            'genre': [genres[slug] for slug in item['genre']],
+        } for item in attrs]
+
+    def create(self, validated_data):
+        return upsert_titles(validated_data)
+
+
+class TitlesBulkSerializer(serializers.Serializer):
+    """Элемент массовой загрузки: `id` указывается для обновления."""
+    id = serializers.IntegerField(required=False, min_value=1)
+    name = serializers.CharField(max_length=256)
+    year = serializers.IntegerField(min_value=0, max_value=32767)
+    category = serializers.SlugField(max_length=50)
+    genre = serializers.ListField(child=serializers.SlugField(max_length=50))
+    description = serializers.CharField(required=False, allow_null=True,
+                                        allow_blank=True)
+
+    validate_year = TitlesCreateSerializer.validate_year
+
+    class Meta:
+        list_serializer_class = TitlesBulkListSerializer
+
+
 class TitlesGetSerializer (serializers.ModelSerializer):
     """Сериализатор для вывода произведения."""
     category = CategoriesSerializer(read_only=True)
@@ -56,7 +133,7 @@ class TitlesGetSerializer (serializers.ModelSerializer):
     rating = serializers.SerializerMethodField()
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
         model = Title
 
     def get_rating(self, obj):
@@ -66,6 +143,25 @@ class TitlesGetSerializer (serializers.ModelSerializer):
         return round(obj.rating, 1) if obj.rating is not None else None
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор распределения оценок произведения."""
+    scores = serializers.SerializerMethodField()
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.SerializerMethodField()
+    median = serializers.FloatField(read_only=True)
+
+    class Meta:
+        fields = ('scores', 'count', 'mean', 'median')
+        model = ScoreHistogram
+
+    def get_scores(self, obj):
+        return {str(score): amount
+                for score, amount in enumerate(obj.counts, MIN_SCORE)}
+
+    def get_mean(self, obj):
+        return round(obj.mean, 1) if obj.mean is not None else None
+
+
 class ReviewsSerializer(serializers.ModelSerializer):
     """Сериализатор для отзыва к произведению."""
     author = serializers.SlugRelatedField(
@@ -77,7 +173,7 @@ class ReviewsSerializer(serializers.ModelSerializer):
         model = Review
 
     def validate(self, data):
-        title = self.context.get('view').kwargs.get('title_id')
+        title = self.context.get('view').get_title()
         request = self.context.get('request')
         if (request.method == "POST"
                 and Review.objects.filter(
@@ -104,6 +200,32 @@ class CommentsSerializer(serializers.ModelSerializer):
         model = Comment
 
 
+class SearchTitleSerializer(serializers.ModelSerializer):
+    """Сериализатор произведения в результатах поиска."""
+
+    class Meta:
+        fields = ('id', 'name', 'year')
+        model = Title
+
+
+class SearchReviewSerializer(ReviewsSerializer):
+    """Сериализатор отзыва в результатах поиска."""
+
+    class Meta(ReviewsSerializer.Meta):
+        fields = ('id', 'title', *ReviewsSerializer.Meta.fields[1:])
+        read_only_fields = fields
+
+
+class SearchCommentSerializer(CommentsSerializer):
+    """Сериализатор комментария в результатах поиска."""
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+
+    class Meta(CommentsSerializer.Meta):
+        fields = ('id', 'title', 'review',
+                  *CommentsSerializer.Meta.fields[1:])
+        read_only_fields = fields
+
+
 class SignupSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True, max_length=254)
     username = serializers.CharField(required=True, max_length=128)
@@ -115,16 +237,55 @@ class SignupSerializer(serializers.Serializer):
             raise serializers.ValidationError(f'Некорректное имя {username}')
         return username
 
-    def validate(self, data, *args, **kwargs):
-        username, email = data.get('username'), data.get('email')
-        if not User.objects.filter(username=username, email=email):
-            if User.objects.filter(username=username):
-                raise serializers.ValidationError(f'Логин {username} занят')
-            if User.objects.filter(email=email):
-                raise serializers.ValidationError(
-                    f'Email {email} уже зарегистрирован')
+    def validate(self, data):
+        username, email = data['username'], data['email']
+        if not user_filters.might_exist(username, email):
+            return data
+        users = self.lookup(username, email)
+        user_filters.record_lookup(found=bool(users))
+        # Найденный пользователь делает save() обновлением без изменений.
+        self.instance = self.resolve(users, username, email)
         return data
 
+    @staticmethod
+    def lookup(username, email):
+        return list(User.objects.filter(
+            Q(username=username) | Q(email=email))[:2])
+
+    @staticmethod
+    def resolve(users, username, email):
+        """Пользователь с этой парой логина и email среди найденных.
+
+        Если занят только логин или только email, это ошибка валидации;
+        если свободны оба, возвращает None.
+        """
+        for user in users:
+            if user.username == username and user.email == email:
+                return user
+        if any(user.username == username for user in users):
+            raise serializers.ValidationError(
+                {'username': [f'Логин {username} занят']})
+        if users:
+            raise serializers.ValidationError(
+                {'email': [f'Email {email} уже зарегистрирован']})
+        return None
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            # Параллельная регистрация успела раньше: её результат
+            # разбирается так же, как при проверке.
+            user = self.resolve(self.lookup(**validated_data),
+                                **validated_data)
+            if user is None:
+                raise
+            return user
+
+    def update(self, instance, validated_data):
+        return instance
+
 
 class ConfirmationSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150)
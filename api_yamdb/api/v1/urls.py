@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
-from .views import (CategoriesViewSet, CommentsViewSet, ConfirmationView,
-                    GenresViewSet, ReviewsViewSet, SignupView, TitlesViewSet,
-                    UserViewSet)
+from .views import (AutocompleteView, CategoriesViewSet, CommentsViewSet,
+                    ConfirmationView, ExportView, GenresViewSet,
+                    ReviewsViewSet, SearchView, SignupFiltersView, SignupView,
+                    TitlesViewSet, UserViewSet)
 
 router = SimpleRouter()
 router.register('categories', CategoriesViewSet)
@@ -21,6 +22,10 @@ router.register(
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('search/', SearchView.as_view()),
+    path('autocomplete/', AutocompleteView.as_view()),
+    path('export/', ExportView.as_view()),
     path('auth/signup/', SignupView.as_view()),
+    path('auth/signup/stats/', SignupFiltersView.as_view()),
     path('auth/token/', ConfirmationView.as_view())
 ]
@@ -1,8 +1,9 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
@@ -10,22 +11,39 @@ from rest_framework.decorators import action
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
-
-from .filters import TitlesFilter
+from reviews import search
+from reviews.models import (Category, Comment, Genre, Review, ScoreHistogram,
+                            Title)
+from users.bloom import user_filters
+from users.outbox import enqueue_email
+
+from .authentication import access_token_for
+from .autocomplete import autocomplete_index
+from .cache import CachedListMixin, CachedResponseMixin, bump_version
+from .export import CatalogExporter, parse_include
+from .facets import count_facets, parse_facets
+from .filters import FullTextSearchFilter, TitlesFilter
+from .nested import NestedParentsMixin
+from .pagination import CursorOrPageNumberPagination
 from .permissions import IsAdminOrReadOnly, IsGodsOrReadOnly, IsSuperUser
+from .readers import (CommentsReader, FastReadMixin, ReviewsReader,
+                      TitlesReader)
+from .renderers import StreamingJSONRenderer
 from .serializers import (CategoriesSerializer, CommentsSerializer,
                           ConfirmationSerializer, CustomUserSerializer,
                           GenresSerializer, ReviewsSerializer,
-                          SignupSerializer, TitlesCreateSerializer,
-                          TitlesGetSerializer)
+                          SearchCommentSerializer, SearchReviewSerializer,
+                          SearchTitleSerializer, SignupSerializer,
+                          TitlesBulkSerializer, TitlesCreateSerializer,
+                          TitlesGetSerializer, TitleStatsSerializer)
 
 User = get_user_model()
 
 
 class CreateListDestroyViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -37,99 +55,272 @@ class CreateListDestroyViewSet(
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+    # Пользователь при промахе кэша, COUNT, страница.
+    query_budget = {'list': 3}
 
 
 class CategoriesViewSet(CreateListDestroyViewSet):
     """Вьюсет для категории."""
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
+    cache_dependencies = (('categories', None),)
 
 
 class GenresViewSet(CreateListDestroyViewSet):
     """Вьюсет для жанра."""
     queryset = Genre.objects.all()
     serializer_class = GenresSerializer
+    cache_dependencies = (('genres', None),)
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
+class TitlesViewSet(CachedResponseMixin, FastReadMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для произведения."""
-    queryset = Title.objects.annotate(rating=Avg("reviews__score"))
-    filter_backends = (filters.SearchFilter, DjangoFilterBackend)
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre')
+    filter_backends = (FullTextSearchFilter, DjangoFilterBackend)
     search_fields = ('name',)
     filterset_class = TitlesFilter
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('name', 'id')
+    facets_query_param = 'facets'
+    cache_dependencies = (('titles', None),)
+    reader_class = TitlesReader
+    # Пользователь, слаги категорий и жанров для фильтров (без кэша), COUNT,
+    # произведения, жанры и до трёх запросов фасетов.
+    query_budget = {'list': 9, 'retrieve': 3, 'stats': 2}
+
+    def list(self, request, *args, **kwargs):
+        facets = parse_facets(
+            request.query_params.get(self.facets_query_param, ''))
+        response = super().list(request, *args, **kwargs)
+        # Условный GET возвращает 304 без данных, потоковый ответ - без
+        # `data`: фасеты добавляются только к обычному ответу со списком.
+        if (facets and isinstance(response, Response)
+                and response.status_code == status.HTTP_200_OK):
+            response.data['facets'] = count_facets(
+                self.filter_queryset(self.get_queryset()), facets)
+        return response
+
+    def get_stream_extra(self, queryset):
+        facets = parse_facets(
+            self.request.query_params.get(self.facets_query_param, ''))
+        if not facets:
+            return {}
+        return {'facets': count_facets(queryset, facets)}
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitlesGetSerializer
+        if self.action == 'stats':
+            return TitleStatsSerializer
+        if self.action == 'bulk':
+            return TitlesBulkSerializer
         return TitlesCreateSerializer
 
+    @action(methods=['post'], detail=False)
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            titles = serializer.save()
+        except IntegrityError:
+            # Обновляемое произведение удалили после проверки или, на СУБД
+            # без RETURNING, параллельная вставка заняла те же id.
+            return Response(
+                {'detail': 'Произведения изменены параллельным запросом, '
+                           'повторите загрузку.'},
+                status=status.HTTP_409_CONFLICT)
+        # bulk_create и bulk_update не отправляют сигналы моделей.
+        bump_version('titles')
+        autocomplete_index.invalidate()
+        created = sum('id' not in item
+                      for item in serializer.validated_data)
+        return Response({
+            'created': created,
+            'updated': len(titles) - created,
+            'ids': [title.pk for title in titles],
+        }, status=status.HTTP_201_CREATED)
+
+    @action(methods=['get'], detail=True)
+    def stats(self, request, pk=None):
+        title = get_object_or_404(
+            Title.objects.select_related('histogram'), pk=pk)
+        try:
+            histogram = title.histogram
+        except ScoreHistogram.DoesNotExist:
+            histogram = ScoreHistogram(title=title)
+        serializer = self.get_serializer(histogram)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+
+class ReviewsViewSet(NestedParentsMixin, CachedResponseMixin, FastReadMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для публикации."""
     serializer_class = ReviewsSerializer
     permission_classes = (IsGodsOrReadOnly,
                           IsAuthenticatedOrReadOnly,)
-
-    def get_title(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('pub_date', 'id')
+    filter_backends = (FullTextSearchFilter,)
+    search_fields = ('text',)
+    cache_dependencies = (('reviews', 'title_id'), ('users', None))
+    reader_class = ReviewsReader
+    # Пользователь, водяной знак, произведение, COUNT, отзывы.
+    query_budget = {'list': 5, 'retrieve': 4}
 
     def get_queryset(self):
         new_queryset = self.get_title().reviews.select_related('author')
         return new_queryset
 
+    def get_watermark(self):
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).aggregate(last_published=Max('pub_date'), last_id=Max('id'),
+                    total=Count('id'))
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(NestedParentsMixin, CachedResponseMixin,
+                      FastReadMixin, viewsets.ModelViewSet):
     """Вьюсет для комментариев."""
     serializer_class = CommentsSerializer
     permission_classes = (IsGodsOrReadOnly,
                           IsAuthenticatedOrReadOnly)
-
-    def get_review(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('pub_date', 'id')
+    filter_backends = (FullTextSearchFilter,)
+    search_fields = ('text',)
+    cache_dependencies = (('comments', 'review_id'), ('users', None))
+    reader_class = CommentsReader
+    query_budget = {'list': 5, 'retrieve': 4}
 
     def get_queryset(self):
         new_queryset = self.get_review().comments.select_related('author')
         return new_queryset
 
+    def get_watermark(self):
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id')
+        ).aggregate(last_published=Max('pub_date'), last_id=Max('id'),
+                    total=Count('id'))
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
 
+class SearchView(APIView):
+    """Поиск по произведениям, отзывам и комментариям одновременно."""
+    permission_classes = (AllowAny,)
+    search_param = api_settings.SEARCH_PARAM
+    default_limit = 10
+    max_limit = 50
+    query_budget = {'get': 4}
+
+    def get(self, request):
+        terms = request.query_params.get(self.search_param, '').split()
+        try:
+            limit = int(request.query_params.get('limit',
+                                                 self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(0, min(limit, self.max_limit))
+        sources = (
+            ('titles', Title.objects.all(), SearchTitleSerializer),
+            ('reviews', Review.objects.select_related('author'),
+             SearchReviewSerializer),
+            ('comments', Comment.objects.select_related('author', 'review'),
+             SearchCommentSerializer),
+        )
+        result = {}
+        for key, queryset, serializer_class in sources:
+            if terms and search.is_available(queryset.db):
+                found = search.ranked(queryset, terms)[:limit]
+            else:
+                found = queryset.none()
+            result[key] = serializer_class(found, many=True).data
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class AutocompleteView(APIView):
+    """Подсказки по началу названия с учётом опечаток."""
+    permission_classes = (AllowAny,)
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit',
+                                                 self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(0, min(limit, self.max_limit))
+        kinds = ['titles', 'genres', 'categories']
+        if request.user.is_superuser:
+            kinds.append('users')
+        if not query:
+            return Response({kind: [] for kind in kinds},
+                            status=status.HTTP_200_OK)
+        return Response(autocomplete_index.search(query, kinds, limit),
+                        status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """Выгрузка каталога в NDJSON: одна строка на произведение."""
+    permission_classes = (IsSuperUser,)
+    include_param = 'include'
+    content_type = 'application/x-ndjson'
+
+    def get(self, request):
+        include = parse_include(
+            request.query_params.get(self.include_param, ''))
+        rows = StreamingJSONRenderer().render_lines(CatalogExporter(include))
+        response = StreamingHttpResponse(rows, content_type=self.content_type)
+        response['Content-Disposition'] = (
+            'attachment; filename="catalog.ndjson"')
+        return response
+
+
 class SignupView(APIView):
     permission_classes = (AllowAny,)
 
     def post(self, request) -> Response:
         serializer = SignupSerializer(data=self.request.data)
         serializer.is_valid(raise_exception=True)
-        user, _ = User.objects.get_or_create(**serializer.validated_data)
-        self.__send_confirmation_code(user.username, user.email)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        user = serializer.save()
+        self.__send_confirmation_code(user)
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
     @staticmethod
-    def __send_confirmation_code(username: str, email: str) -> None:
-        user = get_object_or_404(User, username=username)
+    def __send_confirmation_code(user) -> None:
         confirmation_code: str = default_token_generator.make_token(user)
-        send_mail('Confirmation code', confirmation_code, settings.YAMDB_EMAIL,
-                  [email])
+        enqueue_email('Confirmation code', confirmation_code, user.email,
+                      settings.YAMDB_EMAIL)
+
+
+class SignupFiltersView(APIView):
+    """Счётчики фильтров Блума регистрации в этом процессе."""
+    permission_classes = (IsSuperUser,)
+
+    def get(self, request):
+        return Response(user_filters.stats(), status=status.HTTP_200_OK)
 
 
 class ConfirmationView(APIView):
     permission_classes = (AllowAny,)
 
     def post(self, request):
-        confirmation_code = request.data.get('confirmation_code')
-        username = request.data.get('username')
         serializer = ConfirmationSerializer(data=self.request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(User, username=username)
-        if default_token_generator.check_token(user, confirmation_code):
-            token = AccessToken.for_user(user)
+        user = get_object_or_404(
+            User, username=serializer.validated_data['username'])
+        if default_token_generator.check_token(
+                user, serializer.validated_data['confirmation_code']):
+            token = access_token_for(user)
             return Response({'token': str(token)}, status=status.HTTP_200_OK)
         return Response(
             {'confirmation_code': 'confirmation_code is uncorrect'},
@@ -145,15 +336,18 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     lookup_field = 'username'
     http_method_names = ['patch', 'get', 'post', 'delete']
+    # Для me - и GET, и PATCH: пользователь, проверки уникальности, UPDATE.
+    query_budget = {'list': 3, 'retrieve': 2, 'me': 5}
 
     @action(methods=['get', 'patch'], detail=False,
             permission_classes=[IsAuthenticated])
     def me(self, request):
+        # В request.user загружены только поля для проверки прав.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = CustomUserSerializer(self.request.user)
+            serializer = CustomUserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        user = get_object_or_404(User, username=self.request.user)
         serializer = CustomUserSerializer(user, data=request.data,
                                           partial=True)
         serializer.is_valid(raise_exception=True)
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,9 +71,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами, прагмы ниже
+        # выполняются один раз на соединение.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Прагмы для каждого нового соединения SQLite (reviews/sqlite.py). WAL не
+# блокирует читателей на время записи, busy_timeout даёт писателю дождаться
+# блокировки вместо ошибки `database is locked`. cache_size < 0 - в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 20000,
+}
+
+
+# Cache
+# Кэш ответов API версионируется записями в БД, поэтому бэкенд должен быть
+# общим для всех воркеров: файловый кэш - для воркеров на одном сервере,
+# Memcached или Redis - для нескольких серверов. LocMemCache живёт в памяти
+# одного процесса и допускается только при DEBUG (см. `api.v1.cache`).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+
+# Query budget
+# Превышение `query_budget` вьюсета: в строгом режиме - исключение,
+# иначе предупреждение в лог `api.query_budget`.
+
+QUERY_BUDGET_STRICT = DEBUG
+
 
 # Password validation
 
@@ -114,7 +152,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'],
+        'api.v1.authentication.ClaimsJWTAuthentication'],
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
 }
 
@@ -132,3 +170,6 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 # Confirmation email
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 YAMDB_EMAIL = 'YaMDb@mail.com'
+# Письма копятся в очереди и отправляются командой send_outbox. True -
+# отправка сразу после коммита, без фонового процесса.
+EMAIL_OUTBOX_EAGER = False
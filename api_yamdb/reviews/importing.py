@@ -0,0 +1,127 @@
+"""Разбор и проверка строк CSV для команды `import_yamdb`.
+
+Функции модуля не обращаются к БД и моделям, поэтому могут выполняться в
+процессах пула. Внешние ключи проверяются по заранее загруженным наборам
+id (`IdSet`), которые передаются процессу один раз в `context`.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.utils.dateparse import parse_datetime
+
+_context = {}
+
+
+class IdSet:
+    """Компактный набор id: отсортированный массив и бинарный поиск.
+
+    Занимает 8 байт на значение против ~60 у `set`, поэтому миллионы id
+    дёшево держать и передавать в процессы пула.
+    """
+
+    def __init__(self, ids):
+        self.ids = array('q', ids)
+        if any(a > b for a, b in zip(self.ids, self.ids[1:])):
+            self.ids = array('q', sorted(self.ids))
+
+    def __contains__(self, value):
+        position = bisect_left(self.ids, value)
+        return position < len(self.ids) and self.ids[position] == value
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def optional_int(value):
+    return int(value) if value else None
+
+
+def existing(context, name, value):
+    if value not in context[name]:
+        raise ValueError(f'{name}: id {value} не существует')
+    return value
+
+
+def parse_date(value):
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Некорректная дата {value!r}')
+    return date
+
+
+def parse_score(context, value):
+    low, high = context['score_range']
+    score = int(value)
+    if not low <= score <= high:
+        raise ValueError(f'Оценка {score} вне диапазона {low}..{high}')
+    return score
+
+
+def parse_user(row, context):
+    role = row['role'] or context['default_role']
+    if role not in context['roles']:
+        raise ValueError(f'Неизвестная роль {role!r}')
+    return {'id': int(row['id']), 'username': row['username'],
+            'email': row['email'], 'role': role, 'bio': row['bio'],
+            'first_name': row['first_name'], 'last_name': row['last_name']}
+
+
+def parse_slugged(row, context):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def parse_title(row, context):
+    category_id = optional_int(row['category'])
+    if category_id is not None:
+        existing(context, 'categories', category_id)
+    return {'id': int(row['id']), 'name': row['name'],
+            'year': int(row['year']), 'category_id': category_id,
+            'description': row['description']}
+
+
+def parse_title_genre(row, context):
+    return {'id': int(row['id']),
+            'titles_id': existing(context, 'titles', int(row['title_id'])),
+            'genres_id': existing(context, 'genres', int(row['genre_id']))}
+
+
+def parse_review(row, context):
+    return {'id': int(row['id']),
+            'title_id': existing(context, 'titles', int(row['title_id'])),
+            'text': row['text'],
+            'author_id': existing(context, 'users', int(row['author'])),
+            'score': parse_score(context, row['score']),
+            'pub_date': parse_date(row['pub_date'])}
+
+
+def parse_comment(row, context):
+    return {'id': int(row['id']),
+            'review_id': existing(context, 'reviews', int(row['review_id'])),
+            'text': row['text'],
+            'author_id': existing(context, 'users', int(row['author'])),
+            'pub_date': parse_date(row['pub_date'])}
+
+
+def set_context(context):
+    """Инициализатор процесса пула: сохраняет наборы id и настройки."""
+    _context.clear()
+    _context.update(context)
+
+
+def validate_chunk(parser, rows):
+    """Разбирает пачку `(номер строки, значения)`.
+
+    Строки передаются списками, а заголовок файла - один раз в контексте
+    (`columns`), чтобы не пересылать имена колонок с каждой строкой.
+    Возвращает данные для моделей и список ошибок `(номер строки, текст)`.
+    """
+    columns = _context['columns']
+    records, errors = [], []
+    for line, values in rows:
+        try:
+            records.append(parser(dict(zip(columns, values)), _context))
+        except KeyError as exc:
+            errors.append((line, f'Нет колонки {exc}'))
+        except (TypeError, ValueError) as exc:
+            errors.append((line, str(exc)))
+    return records, errors
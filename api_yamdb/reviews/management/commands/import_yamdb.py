@@ -0,0 +1,253 @@
+"""Импорт данных YaMDb из CSV-файлов.
+
+Файлы читаются потоково и записываются пачками по `--chunk-size` строк,
+каждая пачка - в своей транзакции, поэтому память не зависит от размера
+файла. Записи с уже существующими id пропускаются или, с `--update`,
+обновляются, так что повторный запуск безопасен.
+
+Разбор и проверка строк (типы, диапазон оценок, даты, существование
+внешних ключей) с `--workers N` выполняются в пуле процессов, а запись
+остаётся в одном процессе в исходном порядке пачек.
+
+С `--sync` файлы каталога (`SYNC_SOURCES`) синхронизируются по хэшам
+строк: записываются только изменения, а пропавшие из файла строки
+удаляются (см. `reviews.sync`).
+"""
+import csv
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, connections,
+                       transaction)
+
+from reviews import importing
+from reviews.models import (MAX_SCORE, MIN_SCORE, Category, Comment, Genre,
+                            Review, Title, TitleGenre)
+from reviews.services import recalculate_aggregates
+from reviews.signals import rows_imported
+from reviews.sync import CatalogSync
+
+User = get_user_model()
+
+DEFAULT_PATH = Path(settings.BASE_DIR) / 'static' / 'data'
+MAX_REPORTED_ERRORS = 10
+SYNC_SOURCES = ('titles.csv', 'genre_title.csv')
+
+# Порядок файлов соответствует внешним ключам. Для каждого файла: модель,
+# разбор строки, поля для `--update` и наборы id для проверки ссылок.
+SOURCES = (
+    ('users.csv', User, importing.parse_user,
+     ('username', 'email', 'role', 'bio', 'first_name', 'last_name',
+      'is_staff', 'is_superuser'), {}),
+    ('category.csv', Category, importing.parse_slugged, ('name', 'slug'), {}),
+    ('genre.csv', Genre, importing.parse_slugged, ('name', 'slug'), {}),
+    ('titles.csv', Title, importing.parse_title,
+     ('name', 'year', 'category', 'description'),
+     {'categories': Category}),
+    ('genre_title.csv', TitleGenre, importing.parse_title_genre,
+     ('titles', 'genres'), {'titles': Title, 'genres': Genre}),
+    ('review.csv', Review, importing.parse_review,
+     ('title', 'text', 'author', 'score', 'pub_date'),
+     {'titles': Title, 'users': User}),
+    ('comments.csv', Comment, importing.parse_comment,
+     ('review', 'text', 'author', 'pub_date'),
+     {'reviews': Review, 'users': User}),
+)
+
+
+def build(model, record):
+    obj = model(**record)
+    if model is User:
+        obj.set_unusable_password()
+        obj.apply_role_flags()
+    return obj
+
+
+@contextmanager
+def explicit_dates(*models):
+    """Отключает `auto_now_add`, чтобы сохранить даты из файлов."""
+    fields = [field for model in models
+              for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Импортирует пользователей, каталог, отзывы и комментарии из CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path, default=DEFAULT_PATH,
+            help='Каталог с CSV-файлами.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Количество строк в одной транзакции.')
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Обновлять записи с существующими id вместо пропуска.')
+        parser.add_argument(
+            '--sync', action='store_true',
+            help=('Синхронизировать titles.csv и genre_title.csv по хэшам '
+                  'строк: записать только изменения и удалить строки, '
+                  'пропавшие из файла.'))
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов для разбора и проверки строк.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Псевдоним БД для импорта.')
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.chunk_size = options['chunk_size']
+        self.update = options['update']
+        self.workers = options['workers']
+        self.sync = options['sync']
+        if self.chunk_size < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        if self.workers < 1:
+            raise CommandError('--workers должен быть положительным.')
+        imported, synced = [], []
+        with explicit_dates(Review, Comment):
+            for filename, model, parser, fields, references in SOURCES:
+                path = options['path'] / filename
+                if not path.exists():
+                    self.stdout.write(f'{filename}: файл не найден, пропуск')
+                    continue
+                syncer = None
+                if self.sync and filename in SYNC_SOURCES:
+                    syncer = CatalogSync(filename, model, fields, self.using)
+                    synced.append(syncer)
+                self.import_file(path, model, parser, fields, references,
+                                 syncer)
+                imported.append(model)
+        # Связи удаляются раньше произведений, на которые ссылаются.
+        for syncer in reversed(synced):
+            self.stdout.write(
+                f'{syncer.source}: удалено {syncer.delete_missing()}')
+        if not imported:
+            return
+        self.reset_sequences(imported)
+        if Review in imported:
+            recalculate_aggregates(using=self.using)
+        for model in imported:
+            rows_imported.send(sender=model, using=self.using)
+
+    def get_context(self, references):
+        """Наборы id для проверки ссылок, загруженные из БД перед файлом."""
+        context = {
+            'score_range': (MIN_SCORE, MAX_SCORE),
+            'roles': tuple(User.Roles.values),
+            'default_role': User.Roles.USER,
+        }
+        for name, model in references.items():
+            context[name] = importing.IdSet(
+                model._default_manager.db_manager(self.using)
+                .order_by('pk').values_list('pk', flat=True).iterator())
+        return context
+
+    def validated_chunks(self, rows, parser, context):
+        """Отдаёт результаты проверки пачек в исходном порядке.
+
+        В пул одновременно отправляется не больше двух пачек на процесс,
+        чтобы чтение файла не опережало запись без ограничения памяти.
+        """
+        if self.workers == 1:
+            importing.set_context(context)
+            for chunk in rows:
+                yield importing.validate_chunk(parser, chunk)
+            return
+        with ProcessPoolExecutor(self.workers,
+                                 initializer=importing.set_context,
+                                 initargs=(context,)) as pool:
+            pending = deque()
+            for chunk in rows:
+                pending.append(
+                    pool.submit(importing.validate_chunk, parser, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def read_chunks(self, reader):
+        """Читает пачки пар `(номер строки, значения)` из CSV."""
+        while True:
+            chunk = [(reader.line_num, row)
+                     for row in islice(reader, self.chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+    def import_file(self, path, model, parser, fields, references,
+                    syncer=None):
+        started = time.perf_counter()
+        created = updated = skipped = 0
+        context = self.get_context(references)
+        with open(path, encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            context['columns'] = next(reader, [])
+            chunks = self.read_chunks(reader)
+            for records, errors in self.validated_chunks(
+                    chunks, parser, context):
+                if errors:
+                    raise CommandError('\n'.join(
+                        f'{path.name}, строка {line}: {message}'
+                        for line, message in errors[:MAX_REPORTED_ERRORS]))
+                chunk = [build(model, record) for record in records]
+                try:
+                    if syncer is not None:
+                        counts = syncer.apply_chunk(records, chunk)
+                    else:
+                        counts = self.write_chunk(model, chunk, fields)
+                except DatabaseError as exc:
+                    raise CommandError(f'{path.name}: {exc}')
+                created += counts[0]
+                updated += counts[1]
+                skipped += counts[2]
+        elapsed = time.perf_counter() - started
+        total = created + updated + skipped
+        skipped_label = 'без изменений' if syncer else 'пропущено'
+        self.stdout.write(
+            f'{path.name}: создано {created}, обновлено {updated}, '
+            f'{skipped_label} {skipped} за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else total:.0f} строк/с)')
+
+    def write_chunk(self, model, chunk, fields):
+        manager = model._default_manager.db_manager(self.using)
+        ids = [obj.pk for obj in chunk]
+        with transaction.atomic(using=self.using):
+            # Диапазон вместо IN: не упирается в лимит параметров запроса.
+            existing = set(manager.filter(
+                pk__gte=min(ids), pk__lte=max(ids)
+            ).values_list('pk', flat=True))
+            new = [obj for obj in chunk if obj.pk not in existing]
+            old = [obj for obj in chunk if obj.pk in existing]
+            manager.bulk_create(new)
+            if self.update and old:
+                manager.bulk_update(old, fields)
+        if self.update:
+            return len(new), len(old), 0
+        return len(new), 0, len(old)
+
+    def reset_sequences(self, models):
+        """Сдвигает последовательности id после вставки явных значений."""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
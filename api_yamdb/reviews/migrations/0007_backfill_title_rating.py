@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+BATCH_SIZE = 1000
+
+
+def backfill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    last_pk = 0
+    while True:
+        batch = list(Title.objects.filter(pk__gt=last_pk)
+                     .order_by('pk')[:BATCH_SIZE])
+        if not batch:
+            return
+        totals = {
+            row['title']: (row['total'], row['count'])
+            for row in Review.objects.filter(title__in=batch)
+            .values('title')
+            .annotate(total=Sum('score'), count=Count('id'))
+        }
+        for title in batch:
+            title.rating_sum, title.rating_count = totals.get(title.pk, (0, 0))
+            title.rating = (title.rating_sum / title.rating_count
+                            if title.rating_count else None)
+        Title.objects.bulk_update(
+            batch, ('rating_sum', 'rating_count', 'rating'))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def backfill_histogram(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    ScoreHistogram = apps.get_model('reviews', 'ScoreHistogram')
+    last_pk = 0
+    while True:
+        batch = list(Title.objects.filter(pk__gt=last_pk).order_by('pk')
+                     .values_list('pk', flat=True)[:BATCH_SIZE])
+        if not batch:
+            return
+        histograms = {}
+        for row in (Review.objects.filter(title__in=batch)
+                    .values('title', 'score').annotate(amount=Count('id'))):
+            histogram = histograms.setdefault(
+                row['title'], ScoreHistogram(title_id=row['title']))
+            setattr(histogram, f'score_{row["score"]}', row['amount'])
+        ScoreHistogram.objects.bulk_create(histograms.values())
+        last_pk = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_scorehistogram'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_histogram, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogRowHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=32, verbose_name='Файл источника')),
+                ('row_id', models.BigIntegerField(verbose_name='id строки')),
+                ('digest', models.BigIntegerField(verbose_name='Хэш содержимого')),
+            ],
+            options={
+                'verbose_name': 'Хэш строки каталога',
+                'verbose_name_plural': 'Хэши строк каталога',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='catalogrowhash',
+            constraint=models.UniqueConstraint(fields=('source', 'row_id'), name='unique_catalog_row_hash'),
+        ),
+    ]
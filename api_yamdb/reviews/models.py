@@ -1,9 +1,14 @@
+import threading
+
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 Users = get_user_model()
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+
 
 class Category(models.Model):
     """Модель категории произведений."""
@@ -36,6 +41,19 @@ class Genre(models.Model):
         return self.name
 
 
+class DeletingTitles(threading.local):
+    """id произведений, удаляемых в текущем потоке.
+
+    Агрегаты каскадно удаляемых отзывов таких произведений не пересчитываются.
+    """
+
+    def __init__(self):
+        self.ids = set()
+
+
+deleting_titles = DeletingTitles()
+
+
 class Title(models.Model):
     """Модель произведений."""
     name = models.CharField(max_length=256,
@@ -54,15 +72,33 @@ class Title(models.Model):
         verbose_name="Категория произведения")
     description = models.TextField(null=True, blank=True,
                                    verbose_name="Описание произведения")
+    rating_sum = models.PositiveIntegerField(
+        default=0, verbose_name="Сумма оценок")
+    rating_count = models.PositiveIntegerField(
+        default=0, verbose_name="Количество оценок")
+    rating = models.FloatField(null=True, blank=True,
+                               verbose_name="Рейтинг произведения")
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def delete(self, *args, **kwargs):
+        # Сигнал pre_delete произведения приходит уже после pre_delete его
+        # отзывов, поэтому отметка ставится до сбора каскада.
+        deleting_titles.ids.add(self.pk)
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            deleting_titles.ids.discard(self.pk)
+
 
 class TitleGenre(models.Model):
     genres = models.ForeignKey(Genre, on_delete=models.CASCADE)
@@ -72,6 +108,75 @@ class TitleGenre(models.Model):
         return f'{self.genres} {self.titles}'
 
 
+class ScoreHistogram(models.Model):
+    """Модель распределения оценок произведения."""
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='histogram', verbose_name="Произведение"
+    )
+    score_1 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 1")
+    score_2 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 2")
+    score_3 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 3")
+    score_4 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 4")
+    score_5 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 5")
+    score_6 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 6")
+    score_7 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 7")
+    score_8 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 8")
+    score_9 = models.PositiveIntegerField(default=0,
+                                          verbose_name="Оценок 9")
+    score_10 = models.PositiveIntegerField(default=0,
+                                           verbose_name="Оценок 10")
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.counts}'
+
+    @staticmethod
+    def field_name(score):
+        return f'score_{score}'
+
+    @property
+    def counts(self):
+        return [getattr(self, self.field_name(score))
+                for score in range(MIN_SCORE, MAX_SCORE + 1)]
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return sum(score * amount for score, amount
+                   in enumerate(self.counts, MIN_SCORE)) / self.count
+
+    @property
+    def median(self):
+        """Медиана по накопленным частотам, без сортировки отзывов."""
+        total = self.count
+        if not total:
+            return None
+        middle = ((total + 1) // 2, total // 2 + 1)
+        values, seen = [], 0
+        for score, amount in enumerate(self.counts, MIN_SCORE):
+            seen += amount
+            while len(values) < 2 and seen >= middle[len(values)]:
+                values.append(score)
+        return sum(values) / 2
+
+
 class Review(models.Model):
     """Модель отзыва на произведение."""
     title = models.ForeignKey(
@@ -84,7 +189,8 @@ class Review(models.Model):
         verbose_name="Автор отзыва"
     )
     score = models.IntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(10)],
+        validators=[MinValueValidator(MIN_SCORE),
+                    MaxValueValidator(MAX_SCORE)],
         verbose_name="Оценка"
     )
     pub_date = models.DateTimeField(
@@ -99,6 +205,10 @@ class Review(models.Model):
                 name='unique_review-title-author'
             )
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
         verbose_name = 'Отзыв на произведение'
         verbose_name_plural = 'Отзывы на произведения'
         ordering = ('pub_date',)
@@ -106,6 +216,11 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и рейтинг произведения в одной транзакции."""
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментария на отзыв."""
@@ -128,6 +243,28 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class CatalogRowHash(models.Model):
+    """Хэш содержимого строки каталога на момент последней синхронизации."""
+    source = models.CharField(max_length=32, verbose_name='Файл источника')
+    row_id = models.BigIntegerField(verbose_name='id строки')
+    digest = models.BigIntegerField(verbose_name='Хэш содержимого')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'row_id'],
+                                    name='unique_catalog_row_hash'),
+        ]
+        verbose_name = 'Хэш строки каталога'
+        verbose_name_plural = 'Хэши строк каталога'
+
+    def __str__(self):
+        return f'{self.source}:{self.row_id}'
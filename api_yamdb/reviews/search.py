@@ -0,0 +1,128 @@
+"""Полнотекстовый поиск по произведениям, отзывам и комментариям.
+
+Для SQLite строятся FTS5-индексы с внешним содержимым (`content=`): текст
+хранится только в исходных таблицах, а индекс поддерживается триггерами,
+поэтому синхронизацию не обходят ни `bulk_create`, ни `update()`, ни
+импорт данных. На других СУБД `is_available()` возвращает `False`, и
+вызывающий код откатывается на обычный `SearchFilter`.
+"""
+import re
+import sqlite3
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Review, Title
+
+SEARCH_INDEXES = {
+    Title: ('name', 'description'),
+    Review: ('text',),
+    Comment: ('text',),
+}
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def _fts5_compiled():
+    try:
+        sqlite3.connect(':memory:').execute(
+            'CREATE VIRTUAL TABLE probe USING fts5(body)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+FTS5_AVAILABLE = _fts5_compiled()
+
+
+def index_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def is_available(using='default'):
+    return connections[using].vendor == 'sqlite' and FTS5_AVAILABLE
+
+
+def load_index_config(raw_connection):
+    """Читает служебные таблицы FTS5 до первой записи в соединении.
+
+    Иначе FTS5 читает их внутри первого INSERT, и при параллельной записи
+    SQLite сразу отвечает `database is locked`: повышение блокировки с
+    чтения до записи не ждёт `busy_timeout`.
+    """
+    if not FTS5_AVAILABLE:
+        return
+    for model in SEARCH_INDEXES:
+        try:
+            raw_connection.execute(
+                f'SELECT rowid FROM {index_table(model)} WHERE rowid = 0')
+        except sqlite3.OperationalError:
+            # Индекс ещё не создан миграциями.
+            pass
+
+
+def _trigger_statements(model, fields):
+    table, fts = model._meta.db_table, index_table(model)
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+    delete = (f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+              f"VALUES ('delete', old.id, {old_values});")
+    insert = (f'INSERT INTO {fts}(rowid, {columns}) '
+              f'VALUES (new.id, {new_values});')
+    return {
+        f'{fts}_ai': f'AFTER INSERT ON {table} BEGIN {insert} END',
+        f'{fts}_ad': f'AFTER DELETE ON {table} BEGIN {delete} END',
+        f'{fts}_au': (f'AFTER UPDATE OF {columns} ON {table} '
+                      f'BEGIN {delete} {insert} END'),
+    }
+
+
+def create_search_index(using='default', **kwargs):
+    """Создаёт недостающие FTS5-таблицы и триггеры и перестраивает их.
+
+    Вызывается после каждой миграции: пересоздание таблицы в SQLite
+    (`ALTER` через копирование) удаляет её триггеры.
+    """
+    if not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN "
+                       "('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        for model, fields in SEARCH_INDEXES.items():
+            if model._meta.db_table not in existing:
+                continue
+            fts = index_table(model)
+            triggers = _trigger_statements(model, fields)
+            if fts in existing and existing.issuperset(triggers):
+                continue
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+                f"USING fts5({', '.join(fields)}, "
+                f"content='{model._meta.db_table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')")
+            for name, body in triggers.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def match_expression(terms):
+    """Собирает безопасный запрос MATCH: все слова, с поиском по префиксу."""
+    tokens = TOKEN_PATTERN.findall(' '.join(terms))
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def ranked(queryset, terms):
+    """Отбирает записи по FTS5-индексу и сортирует их по релевантности."""
+    model = queryset.model
+    expression = match_expression(terms)
+    if not expression:
+        return queryset.none()
+    fts = index_table(model)
+    table = model._meta.db_table
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', (expression,)
+    )).annotate(search_rank=RawSQL(
+        f'SELECT rank FROM {fts} WHERE {fts} MATCH %s '
+        f'AND rowid = "{table}"."id"', (expression,)
+    )).order_by('search_rank', *model._meta.ordering, 'pk')
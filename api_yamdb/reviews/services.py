@@ -0,0 +1,178 @@
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, FloatField, Max
+from django.db.models.functions import Cast, NullIf
+
+from .models import MIN_SCORE, Review, ScoreHistogram, Title, TitleGenre
+
+TITLE_FIELDS = ('name', 'year', 'category', 'description')
+
+
+def apply_rating_delta(title_id, score_delta, count_delta):
+    """Атомарно изменяет сумму и количество оценок произведения."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Cast(new_sum, FloatField()) / NullIf(new_count, 0),
+    )
+
+
+def apply_histogram_delta(title_id, old_score=None, new_score=None):
+    """Переносит отзыв между корзинами распределения оценок."""
+    changes = {}
+    if old_score is not None:
+        name = ScoreHistogram.field_name(old_score)
+        changes[name] = F(name) - 1
+    if new_score is not None:
+        name = ScoreHistogram.field_name(new_score)
+        changes[name] = changes.get(name, F(name)) + 1
+    if not changes:
+        return
+    histogram = ScoreHistogram.objects.filter(title_id=title_id)
+    if not histogram.update(**changes) and new_score is not None:
+        ScoreHistogram.objects.get_or_create(title_id=title_id)
+        histogram.update(**changes)
+
+
+def lock_stored_score(review):
+    """Блокирует строку отзыва и возвращает сохранённую оценку.
+
+    Вызывается внутри транзакции записи. Пустое UPDATE берёт блокировку
+    записи (в SQLite - с ожиданием `busy_timeout`), поэтому параллельное
+    изменение или удаление того же отзыва ждёт коммита, и прочитанная
+    после него оценка актуальна. None - строки уже нет.
+    """
+    reviews = Review.objects.using(review._state.db).filter(pk=review.pk)
+    if not reviews.update(score=F('score')):
+        return None
+    return reviews.values_list('score', flat=True).get()
+
+
+def apply_review_change(title_id, old_score=None, new_score=None):
+    """Учитывает создание, изменение или удаление отзыва в агрегатах."""
+    if old_score == new_score:
+        return
+    with transaction.atomic():
+        apply_rating_delta(
+            title_id,
+            (new_score or 0) - (old_score or 0),
+            (new_score is not None) - (old_score is not None),
+        )
+        apply_histogram_delta(title_id, old_score, new_score)
+
+
+def recalculate_aggregates(batch_size=1000, using='default'):
+    """Пересчитывает рейтинги и распределения оценок всех произведений.
+
+    Нужен после записи отзывов в обход сигналов (импорт, `bulk_create`).
+    Произведения обрабатываются пачками по `batch_size`.
+    """
+    titles = Title.objects.using(using)
+    reviews = Review.objects.using(using)
+    last_pk = 0
+    while True:
+        batch = list(titles.filter(pk__gt=last_pk).order_by('pk')
+                     .only('pk')[:batch_size])
+        if not batch:
+            return
+        histograms = {}
+        for row in (reviews.filter(title__in=batch)
+                    .values('title', 'score').annotate(amount=Count('id'))):
+            histogram = histograms.setdefault(
+                row['title'], ScoreHistogram(title_id=row['title']))
+            setattr(histogram, ScoreHistogram.field_name(row['score']),
+                    row['amount'])
+        for title in batch:
+            histogram = histograms.get(title.pk)
+            title.rating_sum = sum(
+                score * amount for score, amount
+                in enumerate(histogram.counts, MIN_SCORE)
+            ) if histogram else 0
+            title.rating_count = histogram.count if histogram else 0
+            title.rating = (title.rating_sum / title.rating_count
+                            if title.rating_count else None)
+        with transaction.atomic(using=using):
+            titles.bulk_update(batch, ('rating_sum', 'rating_count',
+                                       'rating'))
+            ScoreHistogram.objects.using(using).filter(
+                title__in=batch).delete()
+            ScoreHistogram.objects.using(using).bulk_create(
+                histograms.values())
+        last_pk = batch[-1].pk
+
+
+def last_title_id(using):
+    """Наибольший id произведения, выданный когда-либо.
+
+    В SQLite сначала берётся блокировка записи: запись первой командой
+    транзакции ждёт `busy_timeout`, как BEGIN IMMEDIATE, и параллельная
+    вставка не получит те же id. Счётчик AUTOINCREMENT учитывает и id
+    удалённых произведений, они не выдаются повторно.
+    """
+    connection = connections[using]
+    sequence = 0
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE sqlite_sequence SET seq = seq WHERE name = %s',
+                [Title._meta.db_table])
+            cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s',
+                           [Title._meta.db_table])
+            row = cursor.fetchone()
+        sequence = row[0] if row else 0
+    last = Title.objects.using(using).aggregate(last=Max('pk'))['last'] or 0
+    return max(last, sequence)
+
+
+def assign_ids(titles):
+    """Заранее выдаёт id, если СУБД не возвращает их из `bulk_create`.
+
+    Вызывается первой командой транзакции записи. На других СУБД без
+    RETURNING параллельная вставка с теми же id приведёт к IntegrityError
+    и откату, а не к перепутанным жанрам.
+    """
+    using = router.db_for_write(Title)
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        return
+    next_id = last_title_id(using) + 1
+    for offset, title in enumerate(titles):
+        title.pk = next_id + offset
+
+
+def upsert_titles(items):
+    """Создаёт и обновляет произведения пачкой в одной транзакции.
+
+    `items` - проверенные данные с объектами категории и жанров; элементы с
+    `id` обновляются, остальные создаются. У обновлённых произведений
+    меняются только переданные поля, жанры заменяются целиком. Сигналы
+    моделей при этом не отправляются.
+    """
+    new, existing, result = [], defaultdict(list), []
+    for item in items:
+        title = Title(**{field: item.get(field) for field in TITLE_FIELDS})
+        if item.get('id') is not None:
+            title.pk = item['id']
+            fields = tuple(field for field in TITLE_FIELDS if field in item)
+            existing[fields].append(title)
+        else:
+            new.append(title)
+        result.append(title)
+    with transaction.atomic():
+        if new:
+            assign_ids(new)
+            Title.objects.bulk_create(new)
+        for fields, titles in existing.items():
+            Title.objects.bulk_update(titles, fields)
+        if existing:
+            TitleGenre.objects.filter(titles__in=[
+                title.pk for titles in existing.values()
+                for title in titles]).delete()
+        TitleGenre.objects.bulk_create(
+            TitleGenre(titles_id=title.pk, genres=genre)
+            for title, item in zip(result, items)
+            for genre in dict.fromkeys(item['genre'])
+        )
+    return result
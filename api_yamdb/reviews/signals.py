@@ -0,0 +1,63 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import Signal, receiver
+
+from .models import Review, Title, deleting_titles
+from .services import apply_review_change, lock_stored_score
+
+# Строки модели `sender` записаны в обход сигналов моделей (импорт).
+rows_imported = Signal()
+
+
+@receiver(pre_save, sender=Review)
+def remember_stored_score(sender, instance, update_fields=None, **kwargs):
+    """Запоминает сохранённую оценку под блокировкой строки.
+
+    `Review.save` выполняется в транзакции, поэтому оценка не меняется
+    параллельным запросом до пересчёта агрегатов в `post_save`.
+    """
+    if instance._state.adding:
+        instance._loaded_score = None
+    elif update_fields is not None and 'score' not in update_fields:
+        instance._loaded_score = instance.score
+    else:
+        instance._loaded_score = lock_stored_score(instance)
+
+
+@receiver(post_save, sender=Review)
+def update_aggregates_on_save(sender, instance, **kwargs):
+    """Учитывает новую оценку или изменение оценки в агрегатах."""
+    apply_review_change(
+        instance.title_id, instance._loaded_score, instance.score)
+
+
+@receiver(pre_delete, sender=Title)
+def mark_deleting_title(sender, instance, **kwargs):
+    deleting_titles.ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def unmark_deleting_title(sender, instance, **kwargs):
+    deleting_titles.ids.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=Review)
+def remember_deleted_score(sender, instance, **kwargs):
+    """Запоминает оценку удаляемого отзыва под блокировкой строки.
+
+    Сигналы удаления отправляются и для строк, которые уже удалил
+    параллельный запрос; для них оценка - None.
+    """
+    if instance.title_id in deleting_titles.ids:
+        instance._loaded_score = None
+    else:
+        instance._loaded_score = lock_stored_score(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_aggregates_on_delete(sender, instance, **kwargs):
+    """Исключает оценку удалённого отзыва из агрегатов."""
+    if instance.title_id in deleting_titles.ids:
+        return
+    apply_review_change(instance.title_id,
+                        old_score=instance._loaded_score)
@@ -0,0 +1,37 @@
+"""Настройка соединений SQLite через PRAGMA из `SQLITE_PRAGMAS`.
+
+Прагмы выполняются при каждом новом соединении (сигнал
+`connection_created`) напрямую через sqlite3, поэтому не попадают в
+счётчики запросов. `journal_mode=WAL` сохраняется в файле БД, остальные
+действуют только в пределах соединения, и при `CONN_MAX_AGE` выполняются
+один раз на соединение. Там же заранее читаются служебные таблицы
+FTS5 (см. `search.load_index_config`).
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .search import load_index_config
+
+PRAGMA_PATTERN = re.compile(r'^\w+$')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_PATTERN.match(name) or not PRAGMA_PATTERN.match(
+                str(value).lstrip('-')):
+            raise ImproperlyConfigured(
+                f'Некорректная прагма SQLite: {name} = {value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for statement in pragma_statements(
+            getattr(settings, 'SQLITE_PRAGMAS', {})):
+        connection.connection.execute(statement)
+    load_index_config(connection.connection)
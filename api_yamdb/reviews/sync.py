@@ -0,0 +1,111 @@
+"""Дельта-синхронизация каталога по хэшам содержимого строк.
+
+Для каждой строки файла считается хэш разобранных значений и сравнивается
+с сохранённым в `CatalogRowHash` при прошлой синхронизации. Записываются
+только новые и изменённые строки; строки, которые раньше пришли из файла,
+а теперь в нём отсутствуют, удаляются. Записи, созданные не синхронизацией
+(например, через API), синхронизация не удаляет.
+"""
+from array import array
+from hashlib import blake2b
+from itertools import islice
+
+from django.db import transaction
+
+from .importing import IdSet
+from .models import CatalogRowHash
+
+DELETE_BATCH_SIZE = 500
+
+
+def digest(record):
+    """64-битный хэш значений записи в виде знакового целого."""
+    content = '\x1f'.join(
+        '\x00' if record[key] is None else str(record[key])
+        for key in sorted(record))
+    return int.from_bytes(blake2b(content.encode(), digest_size=8).digest(),
+                          'big', signed=True)
+
+
+class CatalogSync:
+    """Синхронизация одного файла: пачки строк и удаление пропавших."""
+
+    def __init__(self, source, model, fields, using='default'):
+        self.source = source
+        self.model = model
+        self.fields = fields
+        self.using = using
+        self.seen = array('q')
+
+    @property
+    def manager(self):
+        return self.model._default_manager.db_manager(self.using)
+
+    @property
+    def hashes(self):
+        return CatalogRowHash.objects.using(self.using).filter(
+            source=self.source)
+
+    def apply_chunk(self, records, objects):
+        """Записывает изменённые строки пачки.
+
+        Возвращает количество созданных, обновлённых и неизменных строк.
+        """
+        digests = [digest(record) for record in records]
+        ids = [obj.pk for obj in objects]
+        self.seen.extend(ids)
+        with transaction.atomic(using=self.using):
+            # Диапазон вместо IN: не упирается в лимит параметров запроса.
+            stored = {
+                row_id: (pk, value) for pk, row_id, value in self.hashes
+                .filter(row_id__gte=min(ids), row_id__lte=max(ids))
+                .values_list('pk', 'row_id', 'digest')
+            }
+            changed = [
+                (obj, value) for obj, value in zip(objects, digests)
+                if stored.get(obj.pk, (None, None))[1] != value
+            ]
+            if not changed:
+                return 0, 0, len(objects)
+            existing = set(self.manager.filter(
+                pk__gte=min(ids), pk__lte=max(ids)
+            ).values_list('pk', flat=True))
+            new = [obj for obj, _ in changed if obj.pk not in existing]
+            old = [obj for obj, _ in changed if obj.pk in existing]
+            self.manager.bulk_create(new)
+            if old:
+                self.manager.bulk_update(old, self.fields)
+            self.save_hashes(changed, stored)
+        return len(new), len(old), len(objects) - len(changed)
+
+    def save_hashes(self, changed, stored):
+        created, updated = [], []
+        for obj, value in changed:
+            if obj.pk in stored:
+                updated.append(CatalogRowHash(
+                    pk=stored[obj.pk][0], digest=value))
+            else:
+                created.append(CatalogRowHash(
+                    source=self.source, row_id=obj.pk, digest=value))
+        manager = CatalogRowHash.objects.db_manager(self.using)
+        manager.bulk_create(created)
+        if updated:
+            manager.bulk_update(updated, ('digest',))
+
+    def delete_missing(self):
+        """Удаляет ранее синхронизированные строки, которых нет в файле."""
+        seen = IdSet(self.seen)
+        # Сначала собираем id, чтобы не удалять из таблицы во время чтения.
+        missing = iter(array('q', (
+            row_id for row_id in self.hashes.order_by('row_id')
+            .values_list('row_id', flat=True).iterator()
+            if row_id not in seen)))
+        deleted = 0
+        while True:
+            batch = list(islice(missing, DELETE_BATCH_SIZE))
+            if not batch:
+                return deleted
+            with transaction.atomic(using=self.using):
+                self.manager.filter(pk__in=batch).delete()
+                self.hashes.filter(row_id__in=batch).delete()
+            deleted += len(batch)
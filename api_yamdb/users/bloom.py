@@ -0,0 +1,146 @@
+"""Фильтры Блума по занятым логинам и email в памяти процесса.
+
+Регистрация с логином и email, которых точно нет в фильтрах, сразу
+переходит к вставке без поиска в БД. Фильтры строятся лениво при первой
+проверке и дополняются сигналами при сохранении пользователя. Пользователи,
+созданные другими процессами, в фильтр не попадают: такую регистрацию
+отсекает уникальный индекс при вставке (см. `SignupSerializer.create`),
+поэтому фильтр может только сэкономить запрос, но не пропустить дубликат.
+Удалённые пользователи остаются в фильтре до перестроения и дают лишние
+запросы, которые учитываются в `stats()` как ложноположительные.
+"""
+import math
+import threading
+from hashlib import blake2b
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+
+User = get_user_model()
+
+ERROR_RATE = 0.01
+MIN_CAPACITY = 10000
+
+
+class BloomFilter:
+    """Битовый массив с `hashes` позициями на значение."""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size
+                for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self.positions(value))
+
+    @property
+    def expected_error_rate(self):
+        """Вероятность ложного срабатывания при текущем заполнении."""
+        return (1 - math.exp(-self.hashes * self.count / self.size)
+                ) ** self.hashes
+
+
+class UserFilters:
+    """Фильтры логинов и email со счётчиками для метрики."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filters = None
+        self.checks = self.lookups = self.false_positives = 0
+
+    def invalidate(self):
+        with self.lock:
+            self.filters = None
+            self.checks = self.lookups = self.false_positives = 0
+
+    def get_filters(self):
+        filters = self.filters
+        if filters is None:
+            filters = self.build()
+            with self.lock:
+                self.filters = filters
+        return filters
+
+    @staticmethod
+    def build():
+        capacity = max(MIN_CAPACITY, User.objects.count() * 2)
+        usernames, emails = BloomFilter(capacity), BloomFilter(capacity)
+        for username, email in User.objects.values_list(
+                'username', 'email').iterator():
+            usernames.add(username)
+            emails.add(email)
+        return usernames, emails
+
+    def might_exist(self, username, email):
+        """False - ни логин, ни email точно не заняты этим процессом."""
+        usernames, emails = self.get_filters()
+        found = username in usernames or email in emails
+        with self.lock:
+            self.checks += 1
+            self.lookups += found
+        return found
+
+    def record_lookup(self, found):
+        """Итог поиска в БД после срабатывания фильтра."""
+        if not found:
+            with self.lock:
+                self.false_positives += 1
+
+    def add(self, user):
+        with self.lock:
+            if self.filters is None:
+                return
+            usernames, emails = self.filters
+            if usernames.count >= usernames.capacity:
+                # Переполненный фильтр перестраивается при следующей проверке.
+                self.filters = None
+                return
+            usernames.add(user.username)
+            emails.add(user.email)
+
+    def stats(self):
+        with self.lock:
+            negatives = self.checks - self.lookups + self.false_positives
+            stats = {
+                'checks': self.checks,
+                'lookups': self.lookups,
+                'false_positives': self.false_positives,
+                'false_positive_rate': (
+                    self.false_positives / negatives if negatives else 0.0),
+            }
+            if self.filters is not None:
+                usernames, _ = self.filters
+                # Срабатывает любой из двух фильтров одинакового заполнения.
+                expected = 1 - (1 - usernames.expected_error_rate) ** 2
+                stats.update({
+                    'capacity': usernames.capacity,
+                    'items': usernames.count,
+                    'expected_false_positive_rate': expected,
+                })
+        return stats
+
+
+user_filters = UserFilters()
+
+
+def update_user_filters(sender, instance, **kwargs):
+    user_filters.add(instance)
+
+
+post_save.connect(update_user_filters, sender=User)
@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from users.outbox import RETENTION, pending, purge, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество писем на одно соединение с почтовым сервером.')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval '
+                 'секунд.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками пустой очереди в режиме --loop.')
+        parser.add_argument(
+            '--retention-days', type=float, default=RETENTION.days,
+            help='Через сколько дней удалять отправленные письма и письма, '
+                 'исчерпавшие попытки.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Псевдоним БД с очередью.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        if options['retention_days'] < 0:
+            raise CommandError('--retention-days не может быть '
+                               'отрицательным.')
+        retention = timedelta(days=options['retention_days'])
+        try:
+            while True:
+                sent, failed = self.send_pending(options)
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено {sent}, ошибок {failed}')
+                deleted = purge(options['database'], retention)
+                if deleted:
+                    self.stdout.write(f'Удалено старых писем: {deleted}')
+                if not options['loop']:
+                    return
+                if not sent and not failed:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    @staticmethod
+    def send_pending(options):
+        """Отправляет все готовые письма; неудачные ждут следующего круга."""
+        total_sent = total_failed = 0
+        last_id = 0
+        while True:
+            batch = pending(options['database']).filter(
+                pk__gt=last_id).order_by('pk')[:options['batch_size']]
+            ids = list(batch.values_list('pk', flat=True))
+            if not ids:
+                return total_sent, total_failed
+            sent, failed = send_batch(
+                pending(options['database']).filter(pk__in=ids))
+            total_sent += sent
+            total_failed += failed
+            last_id = ids[-1]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy
 
 
@@ -16,11 +17,15 @@ class User(AbstractUser):
     bio = models.TextField(max_length=250, blank=True)
 
     def save(self, *args, **kwargs):
+        self.apply_role_flags()
+        super(User, self).save(*args, **kwargs)
+
+    def apply_role_flags(self):
+        """Выставляет флаги доступа по роли; нужен и при bulk_create."""
         if self.role == 'moderator':
             self.is_staff = True
         if self.role == 'admin':
             self.is_superuser = True
-        super(User, self).save(*args, **kwargs)
 
     @property
     def is_admin(self):
@@ -33,3 +38,32 @@ class User(AbstractUser):
     @property
     def is_user(self):
         return self.role == self.Roles.USER
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку фоновым `send_outbox`."""
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(verbose_name='Отправитель')
+    to = models.EmailField(verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Поставлено в очередь')
+    send_after = models.DateTimeField(default=timezone.now,
+                                      verbose_name='Отправить после')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попыток')
+    sent = models.DateTimeField(null=True, blank=True,
+                                verbose_name='Отправлено')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent', 'send_after'],
+                         name='outbox_pending_idx'),
+        ]
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
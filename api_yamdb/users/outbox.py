@@ -0,0 +1,106 @@
+"""Очередь писем: запрос только сохраняет письмо, отправляет `send_outbox`.
+
+Пачка писем уходит через одно соединение почтового бэкенда. Письмо, которое
+не удалось отправить, откладывается с экспоненциальной задержкой; после
+`MAX_ATTEMPTS` попыток оно остаётся в таблице с текстом ошибки и больше не
+отправляется. Рассчитано на один процесс отправки.
+
+Текст письма содержит код подтверждения, поэтому после отправки он
+стирается, а отправленные и исчерпавшие попытки письма удаляются через
+`RETENTION` (см. `purge`).
+
+При `EMAIL_OUTBOX_EAGER = True` письмо отправляется сразу после коммита
+транзакции, в которой поставлено в очередь (используется в тестах).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+RETENTION = timedelta(days=7)
+
+
+def backoff(attempts):
+    """Задержка перед следующей попыткой после `attempts` неудачных."""
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def pending(using=DEFAULT_DB_ALIAS, now=None):
+    return OutboxEmail.objects.using(using).filter(
+        sent__isnull=True, attempts__lt=MAX_ATTEMPTS,
+        send_after__lte=now or timezone.now())
+
+
+def enqueue_email(subject, body, to, from_email=None,
+                  using=DEFAULT_DB_ALIAS):
+    """Ставит письмо в очередь."""
+    email = OutboxEmail.objects.using(using).create(
+        subject=subject, body=body, to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL)
+    if getattr(settings, 'EMAIL_OUTBOX_EAGER', False):
+        transaction.on_commit(
+            lambda: send_batch(pending(using).filter(pk=email.pk)),
+            using=using)
+    return email
+
+
+def send_batch(queryset, connection=None):
+    """Отправляет письма из `queryset` через одно соединение.
+
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    emails = list(queryset)
+    if not emails:
+        return 0, 0
+    now = timezone.now()
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            fail(email, error, now)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, [email.to],
+                    connection=connection)
+                try:
+                    message.send()
+                except Exception as error:
+                    fail(email, error, now)
+                else:
+                    email.sent = now
+                    email.body = ''
+        finally:
+            connection.close()
+    OutboxEmail.objects.db_manager(queryset.db).bulk_update(
+        emails, ('sent', 'body', 'attempts', 'send_after', 'last_error'))
+    sent = sum(email.sent is not None for email in emails)
+    return sent, len(emails) - sent
+
+
+def purge(using=DEFAULT_DB_ALIAS, retention=RETENTION, now=None):
+    """Удаляет отправленные и исчерпавшие попытки письма старше `retention`.
+
+    Возвращает количество удалённых писем.
+    """
+    border = (now or timezone.now()) - retention
+    deleted, _ = OutboxEmail.objects.using(using).filter(
+        Q(sent__lt=border) | Q(attempts__gte=MAX_ATTEMPTS, created__lt=border)
+    ).delete()
+    return deleted
+
+
+def fail(email, error, now):
+    email.attempts += 1
+    email.send_after = now + backoff(email.attempts)
+    email.last_error = f'{type(error).__name__}: {error}'
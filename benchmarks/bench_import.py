@@ -0,0 +1,109 @@
+"""Скорость `import_yamdb` при разном числе процессов проверки.
+
+    python benchmarks/bench_import.py [строк в review.csv]
+
+Генерирует CSV во временном каталоге и импортирует отзывы и комментарии,
+очищая их перед каждым прогоном. Отдельно замеряется только стадия
+разбора и проверки, которая и распараллеливается.
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+from common import setup_django
+
+USERS = 1000
+TITLES = 1000
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate(directory, reviews):
+    write_csv(directory / 'users.csv',
+              ('id', 'username', 'email', 'role', 'bio', 'first_name',
+               'last_name'),
+              ((i, f'user{i}', f'user{i}@yamdb.fake', 'user', '', '', '')
+               for i in range(1, USERS + 1)))
+    write_csv(directory / 'category.csv', ('id', 'name', 'slug'),
+              ((1, 'Фильм', 'movie'),))
+    write_csv(directory / 'titles.csv',
+              ('id', 'name', 'year', 'category', 'description'),
+              ((i, f'Произведение {i}', 1900 + i % 120, 1, '')
+               for i in range(1, TITLES + 1)))
+    # Пара (произведение, автор) уникальна: автор i пишет отзывы подряд.
+    write_csv(directory / 'review.csv',
+              ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+              ((i, i % TITLES + 1, 'Текст отзыва ' * 5,
+                i // TITLES % USERS + 1, i % 10 + 1,
+                '2020-01-13T23:20:02.422Z')
+               for i in range(1, reviews + 1)))
+    write_csv(directory / 'comments.csv',
+              ('id', 'review_id', 'text', 'author', 'pub_date'),
+              ((i, i, 'Комментарий', i % USERS + 1,
+                '2020-01-14T10:00:00.000Z')
+               for i in range(1, reviews + 1)))
+
+
+def main():
+    reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    if reviews > USERS * TITLES:
+        sys.exit(f'Не больше {USERS * TITLES} отзывов.')
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from reviews import importing
+    from reviews.management.commands.import_yamdb import Command
+    from reviews.models import Comment, Review, Title
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        generate(directory, reviews)
+        call_command('import_yamdb', '--path', str(directory),
+                     stdout=StringIO())
+
+        worker_counts = sorted({1, 2, os.cpu_count() or 1})
+        print(f'{"процессов":>10} {"проверка, с":>12} {"импорт, с":>10} '
+              f'{"строк/с":>9}')
+        for workers in worker_counts:
+            command = Command()
+            command.chunk_size, command.workers = 5000, workers
+            command.using = 'default'
+            context = command.get_context(
+                {'titles': Title, 'users': get_user_model()})
+            with open(directory / 'review.csv', encoding='utf-8',
+                      newline='') as file:
+                started = time.perf_counter()
+                reader = csv.reader(file)
+                context['columns'] = next(reader)
+                for _ in command.validated_chunks(
+                        command.read_chunks(reader),
+                        importing.parse_review, context):
+                    pass
+                validation = time.perf_counter() - started
+
+            # Удаление через ORM пересчитывало бы рейтинг на каждый отзыв.
+            with connection.cursor() as cursor:
+                for model in (Comment, Review):
+                    cursor.execute(f'DELETE FROM {model._meta.db_table}')
+            started = time.perf_counter()
+            call_command('import_yamdb', '--path', str(directory),
+                         '--chunk-size', '5000', '--workers', str(workers),
+                         stdout=StringIO())
+            elapsed = time.perf_counter() - started
+            print(f'{workers:>10} {validation:>12.2f} {elapsed:>10.2f} '
+                  f'{reviews * 2 / elapsed:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Сравнение ModelSerializer и читателей строк на списках разного размера.
+
+    python benchmarks/bench_serializers.py
+"""
+from common import best_of, setup_django
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+def populate(amount):
+    from django.contrib.auth import get_user_model
+    from reviews.models import Category, Genre, Review, Title, TitleGenre
+
+    User = get_user_model()
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+              for i in range(3)]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {i:04}', year=1900 + i % 120,
+              category=category, description='Описание', rating=5.5)
+        for i in range(amount))
+    titles = list(Title.objects.all())
+    TitleGenre.objects.bulk_create(
+        TitleGenre(titles=title, genres=genre)
+        for title in titles for genre in genres[:2])
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(amount))
+    Review.objects.bulk_create(
+        Review(title=titles[0], author=author, text='Текст отзыва ' * 10,
+               score=author.pk % 10 + 1)
+        for author in User.objects.all())
+
+
+def main():
+    setup_django()
+    populate(max(PAGE_SIZES))
+
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from api.v1.readers import ReviewsReader, TitlesReader
+    from api.v1.serializers import ReviewsSerializer, TitlesGetSerializer
+    from reviews.models import Review, Title
+
+    context = {'request': APIRequestFactory().get('/')}
+    renderer = JSONRenderer()
+    cases = (
+        ('titles', TitlesGetSerializer, TitlesReader,
+         lambda: Title.objects.select_related('category')
+         .prefetch_related('genre')),
+        ('reviews', ReviewsSerializer, ReviewsReader,
+         lambda: Review.objects.select_related('author')),
+    )
+    print(f'{"endpoint":<10}{"page":>6}{"serializer, ms":>16}'
+          f'{"reader, ms":>12}{"speedup":>9}')
+    for name, serializer_class, reader_class, queryset in cases:
+        reader = reader_class()
+        for size in PAGE_SIZES:
+            def with_serializer():
+                return renderer.render(serializer_class(
+                    queryset()[:size], many=True, context=context).data)
+
+            def with_reader():
+                return renderer.render(
+                    reader.represent(reader.rows(queryset())[:size]))
+
+            assert with_serializer() == with_reader()
+            slow, fast = best_of(with_serializer), best_of(with_reader)
+            print(f'{name:<10}{size:>6}{slow * 1000:>16.2f}'
+                  f'{fast * 1000:>12.2f}{slow / fast:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Регистрации в секунду при параллельных повторных регистрациях.
+
+    python benchmarks/bench_signup.py [запросов на поток]
+
+Потоки одновременно отправляют POST /api/v1/auth/signup/ с данными из
+общего небольшого набора, поэтому одни и те же пользователи регистрируются
+повторно и наперегонки. Считаются ответы по статусам: 200 для новых и
+повторных регистраций, 400 быть не должно, 500 - ошибки БД (например,
+блокировка SQLite).
+"""
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from common import setup_django
+
+USERS = 50
+
+
+def run(threads, requests_per_thread):
+    from django.db import connection
+    from django.test import Client
+    from users.models import OutboxEmail, User
+
+    statuses = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(offset):
+        client = Client(raise_request_exception=False)
+        local = Counter()
+        barrier.wait()
+        for number in range(requests_per_thread):
+            user = (offset + number) % USERS
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': f'user{user}', 'email': f'user{user}@yamdb.fake'})
+            local[response.status_code] += 1
+        connection.close()
+        with lock:
+            statuses.update(local)
+
+    User.objects.all().delete()
+    OutboxEmail.objects.all().delete()
+    workers = [threading.Thread(target=worker, args=(index * 7,))
+               for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, statuses
+
+
+def main():
+    requests_per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(str(Path(directory) / 'bench_signup.sqlite3'))
+        from users.models import User
+
+        print(f'{"потоков":>8} {"запросов/с":>11} {"пользователей":>14} '
+              f'статусы')
+        for threads in (1, 4, 8):
+            elapsed, statuses = run(threads, requests_per_thread)
+            total = sum(statuses.values())
+            users = User.objects.count()
+            print(f'{threads:>8} {total / elapsed:>11.0f} {users:>14} '
+                  f'{dict(sorted(statuses.items()))}')
+
+
+if __name__ == '__main__':
+    main()
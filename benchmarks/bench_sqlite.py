@@ -0,0 +1,133 @@
+"""Параллельные чтение и запись отзывов в SQLite с прагмами и без.
+
+    python benchmarks/bench_sqlite.py [секунд на профиль]
+
+Писатели создают отзывы (с пересчётом рейтинга в той же транзакции),
+читатели в это время запрашивают список произведений и отзывы к ним.
+Профиль `default` - режим журнала и синхронизация SQLite по умолчанию,
+`tuned` - `SQLITE_PRAGMAS` из настроек проекта. Ошибки - исключения
+`database is locked` и подобные.
+"""
+import itertools
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from common import setup_django
+
+WRITERS = 4
+READERS = 4
+TITLES = 50
+USERS = 400
+
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL',
+                   'busy_timeout': 5000}
+
+
+def prepare():
+    from django.contrib.auth import get_user_model
+    from reviews.models import Title
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+        for number in range(USERS))
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000)
+        for number in range(TITLES))
+
+
+def work(action, key, start, counts, lock):
+    """Повторяет `action` до конца замера и добавляет итог в `counts`."""
+    from django.db import OperationalError, connection
+
+    local = Counter()
+    deadline = start()
+    while time.monotonic() < deadline:
+        try:
+            action()
+            local[key] += 1
+        except OperationalError:
+            local['errors'] += 1
+    connection.close()
+    with lock:
+        counts.update(local)
+
+
+def run(duration):
+    from django.contrib.auth import get_user_model
+    from reviews.models import Review, Title
+
+    User = get_user_model()
+    Review.objects.all().delete()
+    users = list(User.objects.values_list('pk', flat=True))
+    titles = list(Title.objects.values_list('pk', flat=True))
+    pairs = iter([(title, user) for user in users for title in titles])
+    numbers = itertools.count()
+    lock = threading.Lock()
+    counts = Counter()
+    barrier = threading.Barrier(WRITERS + READERS)
+    deadline = None
+
+    def start():
+        # Соединение открывается и читает схему до старта замера, как
+        # постоянное соединение при CONN_MAX_AGE.
+        nonlocal deadline
+        Review.objects.exists()
+        if barrier.wait() == 0:
+            deadline = time.monotonic() + duration
+        barrier.wait()
+        return deadline
+
+    def write():
+        with lock:
+            title, user = next(pairs)
+        Review.objects.create(title_id=title, author_id=user,
+                              text='Отзыв', score=user % 10 + 1)
+
+    def read():
+        number = next(numbers)
+        list(Title.objects.select_related('category')[:10])
+        list(Review.objects.filter(
+            title_id=titles[number % TITLES]).select_related('author')[:10])
+
+    threads = [
+        threading.Thread(target=work, args=(action, key, start, counts, lock))
+        for action, key, number in ((write, 'writes', WRITERS),
+                                    (read, 'reads', READERS))
+        for _ in range(number)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(str(Path(directory) / 'bench_sqlite.sqlite3'))
+        from django.conf import settings
+        from django.db import connection
+
+        tuned = settings.SQLITE_PRAGMAS
+        prepare()
+        print(f'{"профиль":>8} {"записей/с":>10} {"чтений/с":>9} '
+              f'{"ошибок":>7}')
+        for name, pragmas in (('default', DEFAULT_PRAGMAS),
+                              ('tuned', tuned)):
+            # Режим журнала меняется только без других соединений.
+            connection.close()
+            settings.SQLITE_PRAGMAS = pragmas
+            counts = run(duration)
+            print(f'{name:>8} {counts["writes"] / duration:>10.0f} '
+                  f'{counts["reads"] / duration:>9.0f} '
+                  f'{counts["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
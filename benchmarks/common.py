@@ -0,0 +1,45 @@
+"""Общая подготовка окружения для бенчмарков.
+
+Бенчмарки запускаются из корня репозитория, например:
+
+    python benchmarks/bench_serializers.py
+
+и работают с отдельной тестовой БД, не трогая `db.sqlite3`.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+
+
+def setup_django(database_name=None):
+    """Настраивает Django и создаёт тестовую БД с миграциями.
+
+    По умолчанию БД в памяти; `database_name` задаёт файл, что нужно для
+    бенчмарков с несколькими потоками.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    if database_name is not None:
+        # Меняем словарь на месте: в нём уже есть значения TEST по умолчанию.
+        settings.DATABASES['default']['TEST']['NAME'] = database_name
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def best_of(function, repeat=5):
+    """Лучшее время из нескольких запусков, в секундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import cache
+
+from api.v1.authentication import token_cache
+from api.v1.autocomplete import autocomplete_index
+from users.bloom import user_filters
+
+
+@pytest.fixture(autouse=True)
+def reset_process_caches():
+    """Сбрасывает кэши процесса: очистка БД между тестами не шлёт сигналы."""
+    cache.clear()
+    autocomplete_index.invalidate()
+    token_cache.clear()
+    user_filters.invalidate()
+    yield
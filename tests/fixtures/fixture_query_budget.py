@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Превышение бюджета SQL-запросов в тестах - ошибка."""
+    settings.QUERY_BUDGET_STRICT = True
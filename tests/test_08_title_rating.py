@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, ScoreHistogram, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_writes(self, client, admin_client,
+                                             user_client, moderator_client,
+                                             moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        create_single_review(user_client, title_id, 'отзыв', 4)
+        review = create_single_review(
+            moderator_client, title_id, 'отзыв', 9).json()
+        assert self.get_rating(client, title_id) == 6.5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        moderator_client.patch(f'{url}{review["id"]}/', data={'score': 7})
+        assert self.get_rating(client, title_id) == 5.5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки.'
+        )
+
+        moderator.delete()
+        assert self.get_rating(client, title_id) == 4, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None
+
+    def test_02_title_stats(self, client, admin_client, user_client,
+                            moderator_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/stats/'
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json() == {
+            'scores': {str(score): 0 for score in range(1, 11)},
+            'count': 0, 'mean': None, 'median': None
+        }
+
+        create_single_review(user_client, title_id, 'отзыв', 2)
+        create_single_review(moderator_client, title_id, 'отзыв', 9)
+        review = create_single_review(
+            admin_client, title_id, 'отзыв', 10).json()
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 3}
+        )
+        data = client.get(url).json()
+        assert data['scores']['2'] == data['scores']['3'] == 1
+        assert data['scores']['9'] == 1 and data['scores']['10'] == 0
+        assert data['count'] == 3
+        assert data['mean'] == round(14 / 3, 1)
+        assert data['median'] == 3
+
+        admin.delete()
+        data = client.get(url).json()
+        assert data['count'] == 2 and data['median'] == 5.5
+
+        response = client.get('/api/v1/titles/0/stats/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_stale_instances(self, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(title=title, author=user,
+                                       text='отзыв', score=5)
+        first, second = (Review.objects.get(pk=review.pk) for _ in range(2))
+        first.score = 7
+        first.save()
+        second.score = 9
+        second.save()
+        title.refresh_from_db()
+        histogram = ScoreHistogram.objects.get(title=title)
+        assert (title.rating_sum, title.rating_count) == (9, 1), (
+            'Проверьте, что изменение отзыва, загруженного до другого '
+            'изменения, учитывает сохранённую оценку.'
+        )
+        assert histogram.counts == [0] * 8 + [1, 0]
+
+        first.delete()
+        second.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что повторное удаление отзыва не вычитает оценку '
+            'дважды.'
+        )
+        assert ScoreHistogram.objects.get(title=title).count == 0
+
+    def test_04_title_delete_queries(self, django_user_model):
+        counts = []
+        for reviews in (2, 20):
+            title = Title.objects.create(name='Произведение', year=2000)
+            for number in range(reviews):
+                author = django_user_model.objects.create(
+                    username=f'author{reviews}_{number}',
+                    email=f'author{reviews}_{number}@yamdb.fake')
+                Review.objects.create(title=title, author=author,
+                                      text='отзыв', score=5)
+            with CaptureQueriesContext(connection) as context:
+                title.delete()
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что при удалении произведения агрегаты его '
+            'отзывов не пересчитываются по одному.'
+        )
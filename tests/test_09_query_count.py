@@ -0,0 +1,57 @@
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    def create_more_titles(self, admin_client, genres, categories, amount):
+        for number in range(amount):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number}',
+                'year': 2000 + number,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[number % 2]['slug'],
+            })
+
+    @pytest.mark.parametrize('extra_titles', (0, 8))
+    def test_01_titles_list(self, client, admin_client,
+                            django_assert_num_queries, extra_titles):
+        _, categories, genres = create_titles(admin_client)
+        self.create_more_titles(admin_client, genres, categories,
+                                extra_titles)
+        # COUNT, произведения с категориями, жанры.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 2 + extra_titles, (
+            'Проверьте, что количество запросов к БД при GET-запросе к '
+            '`/api/v1/titles/` не зависит от количества произведений.'
+        )
+
+    def test_02_title_detail(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        # Произведение с категорией, жанры.
+        with django_assert_num_queries(2):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+
+    def test_03_categories_and_genres_list(self, client, admin_client,
+                                           django_assert_num_queries):
+        create_titles(admin_client)
+        for url in ('/api/v1/categories/', '/api/v1/genres/'):
+            with django_assert_num_queries(2):
+                client.get(url)
+
+    def test_04_reviews_and_comments_list(self, client, admin_client, admin,
+                                          user_client, user,
+                                          django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Водяной знак отзывов, произведение, COUNT, отзывы с авторами.
+        with django_assert_num_queries(4):
+            client.get(url)
+        # Водяной знак комментариев, отзыв, COUNT, комментарии с авторами.
+        with django_assert_num_queries(4):
+            client.get(f'{url}{reviews[0]["id"]}/comments/')
@@ -0,0 +1,93 @@
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+def walk(client, url):
+    """Проходит все страницы по ссылкам `next`, затем обратно по `previous`."""
+    forward, backward = [], []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'В курсорном режиме пагинации не должен выполняться COUNT.'
+        )
+        forward.append([item['id'] for item in data['results']])
+        url, previous = data['next'], data['previous']
+    while previous:
+        data = client.get(previous).json()
+        backward.insert(0, [item['id'] for item in data['results']])
+        previous = data['previous']
+    return forward, backward
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for number in range(11):
+            Title.objects.create(name=f'Том {number % 3}', year=2000)
+        expected = list(Title.objects.order_by('name', 'id')
+                        .values_list('id', flat=True))
+
+        forward, backward = walk(client, '/api/v1/titles/?cursor=')
+        assert sum(forward, []) == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения по порядку `name, id` без повторов.'
+        )
+        assert [len(page) for page in forward] == [10, 3]
+        assert backward == forward[:-1], (
+            'Проверьте, что ссылка `previous` курсорной пагинации '
+            'возвращает предыдущие страницы.'
+        )
+
+        data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 13 and len(data['results']) == 10, (
+            'Без параметра `cursor` должна сохраниться постраничная '
+            'пагинация.'
+        )
+
+    def test_02_reviews_cursor(self, client, admin_client,
+                               django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        for number in range(25):
+            author = django_user_model.objects.create(
+                username=f'author{number}', email=f'a{number}@yamdb.fake')
+            Review.objects.create(title_id=titles[0]['id'], author=author,
+                                  text='отзыв', score=5)
+        expected = list(Review.objects.order_by('pub_date', 'id')
+                        .values_list('id', flat=True))
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor='
+        forward, backward = walk(client, url)
+        assert sum(forward, []) == expected
+        assert backward == forward[:-1]
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_tampered_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        titles_url = '/api/v1/titles/'
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        cases = (
+            (titles_url, '["a", "x"]'),
+            (titles_url, '[0, ["a", "x"]]'),
+            (titles_url, '[0, ["a", [1]]]'),
+            (titles_url, '[0, [null, 1]]'),
+            (reviews_url, '[0, ["garbage", 1]]'),
+            (reviews_url, '[0, [{}, 1]]'),
+        )
+        for url, cursor in cases:
+            encoded = urlsafe_b64encode(cursor.encode()).decode()
+            response = client.get(f'{url}?cursor={encoded}')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что подделанный курсор `{cursor}` для `{url}` '
+                'возвращает 404.'
+            )
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11FullTextSearch:
+
+    def test_01_titles_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.create(name='Терминатор 2: Судный день', year=1991,
+                             description='Терминатор возвращается')
+
+        response = client.get('/api/v1/titles/?search=терминатор')
+        assert response.status_code == HTTPStatus.OK
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Терминатор 2: Судный день', 'Терминатор'], (
+            'Проверьте, что поиск по произведениям учитывает название и '
+            'описание и сортирует результаты по релевантности.'
+        )
+
+        response = client.get('/api/v1/titles/?search=ореш')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']], 'Поиск должен находить слова по префиксу.'
+
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/',
+                           data={'name': 'Die Hard'})
+        response = client.get('/api/v1/titles/?search=орешек')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что индекс обновляется при изменении произведения.'
+        )
+        response = client.get('/api/v1/titles/?search="(*')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_global_search(self, client, admin_client, admin, user,
+                              user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+
+        response = client.get('/api/v1/search/?search=number 2')
+        assert response.status_code == HTTPStatus.OK, (
+            'Эндпоинт `/api/v1/search/` не найден или недоступен '
+            'неавторизованному пользователю.'
+        )
+        data = response.json()
+        assert data['titles'] == []
+        assert [review['id'] for review in data['reviews']] == [
+            reviews[1]['id']]
+        assert data['reviews'][0]['title'] == titles[0]['id']
+        assert [comment['id'] for comment in data['comments']] == [
+            comments[1]['id']]
+        assert data['comments'][0]['review'] == reviews[0]['id']
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        data = client.get('/api/v1/search/?search=number').json()
+        assert data['reviews'] == data['comments'] == [], (
+            'Проверьте, что каскадное удаление убирает записи из индекса.'
+        )
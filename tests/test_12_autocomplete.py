@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.v1.autocomplete import REFRESH_INTERVAL, autocomplete_index
+from reviews.models import Genre
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Autocomplete:
+    url = '/api/v1/autocomplete/'
+
+    def test_01_autocomplete(self, client, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get(f'{self.url}?q=Кре')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.url}` не найден или недоступен '
+            'неавторизованному пользователю.'
+        )
+        data = response.json()
+        assert data['titles'] == [
+            {'id': titles[1]['id'], 'name': titles[1]['name']}]
+        assert 'users' not in data, (
+            'Имена пользователей должны подсказываться только '
+            'администратору.'
+        )
+
+        data = client.get(f'{self.url}?q=термниатор').json()
+        assert [title['id'] for title in data['titles']] == [
+            titles[0]['id']], 'Проверьте, что подсказки учитывают опечатки.'
+
+        data = client.get(f'{self.url}?q=ко').json()
+        assert data['genres'] == [{'name': 'Комедия', 'slug': 'comedy'}]
+
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Космос', 'slug': 'space'})
+        admin_client.delete('/api/v1/genres/comedy/')
+        data = client.get(f'{self.url}?q=ко').json()
+        assert data['genres'] == [{'name': 'Космос', 'slug': 'space'}], (
+            'Проверьте, что индекс подсказок обновляется при записи.'
+        )
+
+        data = admin_client.get(f'{self.url}?q=testu').json()
+        assert data['users'][0] == {'username': user.username}
+
+    def test_02_background_refresh(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(f'{self.url}?q=Кре')
+        Genre.objects.bulk_create([Genre(name='Космос', slug='space')])
+        autocomplete_index.built_at -= REFRESH_INTERVAL + 1
+
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(f'{self.url}?q=ко').json()
+        assert data['genres'] == [{'name': 'Комедия', 'slug': 'comedy'}]
+        assert not context.captured_queries, (
+            'Проверьте, что устаревший индекс перестраивается не в потоке '
+            'запроса.'
+        )
+        refresh_thread = autocomplete_index.refresh_thread
+        Genre.objects.filter(slug='comedy').delete()
+        refresh_thread.join()
+        assert autocomplete_index.refresh_thread is refresh_thread, (
+            'Проверьте, что одновременно идёт только одно перестроение.'
+        )
+
+        data = client.get(f'{self.url}?q=ко').json()
+        assert data['genres'] == [{'name': 'Космос', 'slug': 'space'}], (
+            'Проверьте, что фоновое перестроение подхватывает изменения '
+            'и не теряет записи, сделанные во время него.'
+        )
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleFilters:
+    url = '/api/v1/titles/'
+
+    def get_ids(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что фильтр `{query}` для `{self.url}` работает.'
+        )
+        return sorted(title['id'] for title in response.json()['results'])
+
+    def test_01_filters(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+
+        assert self.get_ids(client, 'genre__in=horror,comedy,drama') == [
+            first, second], (
+            'Фильтр по нескольким жанрам не должен дублировать произведения.'
+        )
+        assert self.get_ids(client, 'genre=comedy') == [first]
+        assert self.get_ids(client, 'category__in=films,books') == [
+            first, second]
+        assert self.get_ids(client, 'year__gte=1985') == [second]
+        assert self.get_ids(client, 'year__lte=1985&category=films') == [
+            first]
+        assert self.get_ids(client, 'genre=horror&category=books') == []
+
+        response = client.get(f'{self.url}?genre=unknown')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что для несуществующего слага жанра возвращается '
+            'ответ со статусом 400.'
+        )
+
+    def test_02_cached_choices(self, client, admin_client,
+                               django_assert_num_queries):
+        create_titles(admin_client)
+        # Слаги жанров, COUNT, произведения, жанры произведений.
+        with django_assert_num_queries(4):
+            client.get(f'{self.url}?genre=comedy')
+        with django_assert_num_queries(3):
+            client.get(f'{self.url}?genre=comedy&year=1984')
+
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get(f'{self.url}?genre=western')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что список жанров для фильтра обновляется после '
+            'создания жанра.'
+        )
+
+    def test_03_facets(self, client, admin_client,
+                       django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(self.url, data={
+            'name': 'Чужие', 'year': 1986, 'genre': ['horror'],
+            'category': 'films'
+        })
+        url = f'{self.url}?year__lte=1987&facets=genre,category,year'
+        # COUNT, произведения, жанры произведений и по запросу на фасет.
+        with django_assert_num_queries(6):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 2
+        assert data['facets'] == {
+            'genre': [{'slug': 'horror', 'count': 2},
+                      {'slug': 'comedy', 'count': 1}],
+            'category': [{'slug': 'films', 'count': 2}],
+            'year': [{'decade': 1980, 'count': 2}],
+        }, (
+            'Проверьте, что фасеты считаются по отфильтрованному списку '
+            'произведений.'
+        )
+        assert 'facets' not in client.get(self.url).json()
+
+        response = client.get(f'{self.url}?facets=author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
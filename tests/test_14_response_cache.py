@@ -0,0 +1,134 @@
+import warnings
+from http import HTTPStatus
+
+import pytest
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.exceptions import ImproperlyConfigured
+
+from api.v1.cache import check_shared_backend
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    def test_01_cached_reads(self, client, admin_client, admin,
+                             django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        urls = (
+            ('/api/v1/titles/', 0),
+            (f'/api/v1/titles/{titles[0]["id"]}/', 0),
+            ('/api/v1/categories/', 0),
+            ('/api/v1/genres/', 0),
+            # Остаётся только запрос водяного знака отзывов.
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/', 1),
+        )
+        for url, queries in urls:
+            first = client.get(url)
+            with django_assert_num_queries(queries):
+                second = client.get(url)
+            assert second.json() == first.json(), (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+                'кэша без обращений к БД.'
+            )
+
+    def test_02_writes_invalidate(self, client, admin_client, admin,
+                                  user_client, django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        assert client.get(title_url).json()['rating'] == 5
+        client.get(reviews_url)
+
+        create_single_review(user_client, titles[0]['id'], 'отзыв', 10)
+        assert client.get(title_url).json()['rating'] == 7.5, (
+            'Проверьте, что кэш произведения сбрасывается при создании '
+            'отзыва.'
+        )
+        assert client.get(reviews_url).json()['count'] == 2
+
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'})
+        admin_client.patch('/api/v1/users/me/', data={'bio': 'Био'})
+        with django_assert_num_queries(1):
+            client.get(reviews_url)
+
+        admin_client.patch('/api/v1/users/me/',
+                           data={'username': 'renamed'})
+        authors = {review['author']
+                   for review in client.get(reviews_url).json()['results']}
+        assert 'renamed' in authors
+
+        client.get('/api/v1/categories/')
+        admin_client.delete('/api/v1/categories/films/')
+        assert client.get(title_url).json()['category'] is None
+        assert client.get('/api/v1/categories/').json()['count'] == 1
+
+        admin_client.delete(title_url)
+        response = client.get(reviews_url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что кэш отзывов сбрасывается при удалении '
+            'произведения.'
+        )
+
+    def test_03_conditional_get(self, client, admin_client, admin,
+                                user_client, django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        for url in ('/api/v1/titles/', '/api/v1/titles/?facets=genre',
+                    '/api/v1/categories/',
+                    f'/api/v1/titles/{titles[0]["id"]}/reviews/'):
+            response = client.get(url)
+            etag = response['ETag']
+            assert etag and response.has_header('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовки `ETag` и `Last-Modified`.'
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с `If-None-Match` '
+                'возвращает ответ со статусом 304, если данные не менялись.'
+            )
+            assert response['ETag'] == etag
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            client.get(url, HTTP_IF_NONE_MATCH=etag)
+        create_single_review(user_client, titles[0]['id'], 'отзыв', 1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после создания отзыва меняется `ETag` списка '
+            'отзывов.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_04_cache_keys(self, client, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        long_query = '&'.join(f'name=название {number}'
+                              for number in range(30))
+        urls = (f'/api/v1/titles/?{long_query}',
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            for url in urls:
+                assert client.get(url).status_code == HTTPStatus.OK, (
+                    f'Проверьте, что ключ кэша ответа на `{url}` подходит '
+                    'для Memcached: без пробелов и не длиннее 250 символов.'
+                )
+
+    def test_05_shared_backend(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        settings.DEBUG = False
+        with pytest.raises(ImproperlyConfigured):
+            check_shared_backend()
+        settings.DEBUG = True
+        check_shared_backend()
+        settings.DEBUG = False
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/yamdb'}}
+        check_shared_backend()
@@ -0,0 +1,40 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.v1.readers import CommentsReader, ReviewsReader, TitlesReader
+from api.v1.serializers import (CommentsSerializer, ReviewsSerializer,
+                                TitlesGetSerializer)
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15FastRead:
+
+    @pytest.mark.parametrize('reader_class,serializer_class,queryset', (
+        (TitlesReader, TitlesGetSerializer,
+         lambda: Title.objects.select_related('category')
+         .prefetch_related('genre')),
+        (ReviewsReader, ReviewsSerializer,
+         lambda: Review.objects.select_related('author')),
+        (CommentsReader, CommentsSerializer,
+         lambda: Comment.objects.select_related('author')),
+    ))
+    def test_01_byte_identical(self, admin_client, admin, user_client, user,
+                               reader_class, serializer_class, queryset):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        create_single_review(user_client, titles[1]['id'], 'Ещё ', 3)
+        Title.objects.create(name='Без категории', year=2000)
+
+        request = APIRequestFactory().get('/')
+        expected = JSONRenderer().render(serializer_class(
+            queryset(), many=True, context={'request': request}).data)
+        reader = reader_class()
+        actual = JSONRenderer().render(
+            reader.represent(reader.rows(queryset())))
+        assert actual == expected, (
+            f'Проверьте, что `{reader_class.__name__}` формирует тот же JSON, '
+            f'что и `{serializer_class.__name__}`.'
+        )
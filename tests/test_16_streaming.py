@@ -0,0 +1,78 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.renderers import StreamingJSONRenderer
+from reviews.models import Category, Title
+from tests.utils import create_reviews
+
+
+def stream_content(response):
+    assert response.streaming, (
+        'Проверьте, что при параметре `stream=1` список отдаётся потоково.'
+    )
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Streaming:
+
+    def test_01_same_as_regular(self, client, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        urls = (
+            '/api/v1/titles/?page_size=2',
+            '/api/v1/titles/?page_size=1&page=2&facets=genre',
+            '/api/v1/titles/?genre=comedy',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        )
+        for url in urls:
+            expected = client.get(url).json()
+            response = client.get(f'{url}&stream=1' if '?' in url
+                                  else f'{url}?stream=1')
+            assert response.status_code == HTTPStatus.OK
+            data = json.loads(stream_content(response))
+            # Ссылки на соседние страницы сохраняют потоковый режим.
+            for link in ('next', 'previous'):
+                if data[link] is not None:
+                    assert 'stream=1' in data[link]
+                    data[link] = expected[link]
+            assert data == expected, (
+                f'Проверьте, что потоковый ответ `{url}` совпадает с обычным.'
+            )
+
+    def test_02_page_size_and_chunks(self, client, settings):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {i:03}', year=2000, category=category)
+            for i in range(25)
+        )
+        response = client.get('/api/v1/titles/?stream=1&page_size=20')
+        data = json.loads(stream_content(response))
+        assert data['count'] == 25
+        assert len(data['results']) == 20, (
+            'Проверьте, что размер страницы задаётся параметром `page_size`.'
+        )
+        assert data['next'] is not None
+        assert client.get(
+            '/api/v1/titles/?stream=1&page=9').status_code == (
+            HTTPStatus.NOT_FOUND)
+
+    def test_03_not_cached(self, client, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        url = '/api/v1/titles/?stream=1'
+        stream_content(client.get(url))
+        stream_content(client.get(url))
+
+    def test_04_cursor_falls_back(self, client, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        response = client.get('/api/v1/titles/?stream=1&cursor=')
+        assert not response.streaming
+        assert set(response.json()) == {'next', 'previous', 'results'}
+
+    def test_05_escapes_line_separators(self):
+        content = b''.join(StreamingJSONRenderer().render_page(
+            {'count': 1}, [{'text': 'a b '}]))
+        assert content == (
+            b'{"count":1,"results":[{"text":"a\\u2028b\\u2029"}]}'
+        ), 'Проверьте, что U+2028 и U+2029 экранируются, как в JSONRenderer.'
@@ -0,0 +1,67 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.export import CatalogExporter
+from reviews.models import Title
+from tests.utils import create_comments
+
+
+def read_lines(response):
+    content = b''.join(response.streaming_content)
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Export:
+    url = '/api/v1/export/'
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(self.url).status_code == (
+                HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что выгрузка доступна только администратору.'
+
+    def test_02_titles(self, admin_client, admin):
+        create_comments(admin_client, {admin: admin_client})
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = read_lines(response)
+        for line in lines:
+            expected = admin_client.get(
+                f'/api/v1/titles/{line["id"]}/').json()
+            assert line == expected, (
+                'Проверьте, что строка выгрузки совпадает с карточкой '
+                'произведения.'
+            )
+        assert [line['id'] for line in lines] == list(
+            Title.objects.order_by('id').values_list('id', flat=True))
+
+    def test_03_include(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        lines = {line['id']: line for line in read_lines(
+            admin_client.get(f'{self.url}?include=comments'))}
+        title = lines[titles[0]['id']]
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert [review['id'] for review in title['reviews']] == [
+            review['id'] for review in admin_client.get(url).json()['results']
+        ]
+        review = next(review for review in title['reviews']
+                      if review['id'] == reviews[0]['id'])
+        assert [comment['id'] for comment in review['comments']] == [
+            comment['id'] for comment in comments
+        ], 'Проверьте, что комментарии вложены в отзывы.'
+        assert admin_client.get(
+            f'{self.url}?include=users').status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_batched_queries(self, admin_client, admin,
+                                django_assert_num_queries):
+        create_comments(admin_client, {admin: admin_client})
+        exporter = CatalogExporter({'reviews', 'comments'})
+        # Произведения, а на пачку - жанры, отзывы и комментарии.
+        with django_assert_num_queries(4):
+            list(exporter)
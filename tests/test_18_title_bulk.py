@@ -0,0 +1,160 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.v1.serializers import TitlesBulkListSerializer
+from reviews.models import Category, Genre, Title
+from tests.utils import create_titles
+
+
+def make_items(count, category='movie', genres=('drama', 'comedy')):
+    return [{
+        'name': f'Партнёрское произведение {i}',
+        'year': 2000 + i % 20,
+        'category': category,
+        'genre': list(genres),
+        'description': f'Описание {i}',
+    } for i in range(count)]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    @pytest.fixture
+    def catalog(self):
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    def test_01_permissions(self, client, user_client, catalog):
+        assert client.post(self.url, make_items(1),
+                           content_type='application/json').status_code == (
+            HTTPStatus.UNAUTHORIZED)
+        assert user_client.post(self.url, make_items(1), format='json'
+                                ).status_code == HTTPStatus.FORBIDDEN
+        assert not Title.objects.exists()
+
+    def test_02_create(self, admin_client, client, catalog):
+        response = admin_client.post(self.url, make_items(3), format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert data['created'] == 3 and data['updated'] == 0
+        for title_id in data['ids']:
+            title = client.get(f'/api/v1/titles/{title_id}/').json()
+            assert title['category']['slug'] == 'movie'
+            assert [genre['slug'] for genre in title['genre']] == [
+                'drama', 'comedy'], (
+                'Проверьте, что массовая загрузка сохраняет жанры.'
+            )
+        assert client.get('/api/v1/titles/').json()['count'] == 3, (
+            'Проверьте, что массовая загрузка сбрасывает кэш списка.'
+        )
+
+    def test_03_update(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        items = [{
+            'id': titles[0]['id'],
+            'name': 'Новое название',
+            'year': 1999,
+            'category': categories[1]['slug'],
+            'genre': [genres[0]['slug']],
+        }] + make_items(1, categories[0]['slug'], [genres[1]['slug']])
+        response = admin_client.post(self.url, items, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['created'] == 1
+        assert response.json()['updated'] == 1
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert title['name'] == 'Новое название'
+        assert title['category']['slug'] == categories[1]['slug']
+        assert [genre['slug'] for genre in title['genre']] == [
+            genres[0]['slug']], (
+            'Проверьте, что жанры обновлённого произведения заменяются.'
+        )
+
+    def test_04_item_errors(self, admin_client, catalog):
+        items = make_items(4)
+        items[1]['category'] = 'unknown'
+        items[2]['genre'] = ['drama', 'unknown']
+        items[3]['year'] = 3000
+        response = admin_client.post(self.url, items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 4 and errors[0] == {}
+        assert list(errors[3]) == ['year']
+        response = admin_client.post(self.url, items[:3], format='json')
+        errors = response.json()
+        assert errors[0] == {} and list(errors[1]) == ['category'], (
+            'Проверьте, что ошибки возвращаются по каждому элементу.'
+        )
+        assert list(errors[2]) == ['genre']
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке не сохраняется ни одно произведение.'
+        )
+
+    def test_05_constant_queries(self, admin_client, catalog):
+        counts = []
+        for size in (2, 40):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(self.url, make_items(size),
+                                             format='json')
+            assert response.status_code == HTTPStatus.CREATED
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов не зависит от размера загрузки.'
+        )
+        assert Title.objects.count() == 42
+
+    def test_06_ids_not_reused(self, admin_client, catalog):
+        Title.objects.create(name='Первое', year=2000)
+        last = Title.objects.create(name='Последнее', year=2000).pk
+        Title.objects.filter(pk=last).delete()
+        response = admin_client.post(self.url, make_items(2), format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert min(response.json()['ids']) > last, (
+            'Проверьте, что массовая загрузка не выдаёт повторно id '
+            'удалённых произведений.'
+        )
+
+    def test_07_concurrent_delete(self, admin_client, catalog, monkeypatch):
+        title = Title.objects.create(name='Удаляемое', year=2000)
+        resolve = TitlesBulkListSerializer.resolve
+
+        def resolve_then_delete(serializer, attrs):
+            attrs = resolve(serializer, attrs)
+            Title.objects.filter(pk=title.pk).delete()
+            return attrs
+
+        monkeypatch.setattr(TitlesBulkListSerializer, 'resolve',
+                            resolve_then_delete)
+        response = admin_client.post(
+            self.url, [{**make_items(1)[0], 'id': title.pk}], format='json')
+        assert response.status_code == HTTPStatus.CONFLICT, (
+            'Проверьте, что конфликт с параллельным запросом возвращает 409, '
+            'а не ошибку сервера.'
+        )
+        assert not Title.objects.exists()
+
+    def test_08_update_keeps_missing_fields(self, admin_client, catalog):
+        kept, changed = (
+            Title.objects.create(name=name, year=2000, description='Описание')
+            for name in ('Без описания', 'С описанием'))
+        items = [
+            {'id': kept.pk, 'name': 'Новое', 'year': 2001,
+             'category': 'movie', 'genre': ['drama']},
+            {'id': changed.pk, 'name': 'Новое', 'year': 2001,
+             'category': 'movie', 'genre': ['drama'],
+             'description': 'Новое описание'},
+        ]
+        response = admin_client.post(self.url, items, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        kept.refresh_from_db()
+        changed.refresh_from_db()
+        assert kept.description == 'Описание', (
+            'Проверьте, что обновление не стирает непереданные поля.'
+        )
+        assert kept.year == changed.year == 2001
+        assert changed.description == 'Новое описание'
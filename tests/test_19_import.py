@@ -0,0 +1,176 @@
+import csv
+import shutil
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Avg
+from rest_framework.test import APIClient
+
+from api.v1.authentication import access_token_for
+from reviews.models import (Category, Comment, Genre, Review, ScoreHistogram,
+                            Title, TitleGenre)
+
+DATA_PATH = settings.BASE_DIR / 'static' / 'data'
+
+
+def row_count(filename):
+    with open(DATA_PATH / filename, encoding='utf-8', newline='') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+def run_import(*args):
+    out = StringIO()
+    call_command('import_yamdb', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Import:
+
+    def test_01_imports_all_files(self, django_user_model):
+        output = run_import('--chunk-size', '7')
+        for filename, model in (('users.csv', django_user_model),
+                                ('category.csv', Category),
+                                ('genre.csv', Genre),
+                                ('titles.csv', Title),
+                                ('genre_title.csv', TitleGenre),
+                                ('review.csv', Review),
+                                ('comments.csv', Comment)):
+            assert model.objects.count() == row_count(filename), (
+                f'Проверьте, что импортируются все строки `{filename}`.'
+            )
+            assert f'{filename}: создано' in output
+        assert 'строк/с' in output
+
+    def test_02_model_logic(self, django_user_model):
+        run_import()
+        admin = django_user_model.objects.get(role='admin')
+        moderator = django_user_model.objects.get(role='moderator')
+        assert admin.is_superuser and moderator.is_staff, (
+            'Проверьте, что импорт выставляет флаги доступа по роли.'
+        )
+        assert not admin.has_usable_password()
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year < 2023, (
+            'Проверьте, что импорт сохраняет даты публикации из файла.'
+        )
+        for title in Title.objects.annotate(average=Avg('reviews__score')):
+            assert title.rating == title.average, (
+                'Проверьте, что после импорта пересчитываются рейтинги.'
+            )
+        assert ScoreHistogram.objects.count() == (
+            Review.objects.values('title').distinct().count())
+
+    def test_03_idempotent(self):
+        run_import()
+        output = run_import()
+        assert Review.objects.count() == row_count('review.csv')
+        assert 'создано 0' in output and 'пропущено 0' not in output, (
+            'Проверьте, что повторный импорт пропускает существующие записи.'
+        )
+
+    def test_04_update(self, tmp_path):
+        run_import()
+        with open(tmp_path / 'category.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('id', 'name', 'slug'))
+            writer.writerow((1, 'Кино', 'movie'))
+        run_import('--path', str(tmp_path))
+        assert Category.objects.get(pk=1).name != 'Кино'
+        output = run_import('--path', str(tmp_path), '--update')
+        assert 'обновлено 1' in output
+        assert Category.objects.get(pk=1).name == 'Кино', (
+            'Проверьте, что `--update` обновляет существующие записи.'
+        )
+
+    def test_05_bad_row(self, tmp_path):
+        with open(tmp_path / 'genre.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            file.write('id,name,slug\n1,Драма,drama\nx,Комедия,comedy\n')
+        with pytest.raises(CommandError, match='genre.csv, строка 3'):
+            run_import('--path', str(tmp_path))
+
+    def test_06_parallel_workers(self):
+        output = run_import('--chunk-size', '10', '--workers', '2')
+        assert Review.objects.count() == row_count('review.csv'), (
+            'Проверьте, что импорт с `--workers` загружает все строки.'
+        )
+        assert Comment.objects.count() == row_count('comments.csv')
+        assert 'comments.csv: создано' in output
+
+    @pytest.mark.parametrize('workers', ('1', '2'))
+    def test_07_validation(self, tmp_path, workers):
+        run_import()
+        with open(tmp_path / 'review.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('id', 'title_id', 'text', 'author', 'score',
+                             'pub_date'))
+            writer.writerow((1000, 1, 'ok', 100, 5, '2020-01-01T00:00:00Z'))
+            writer.writerow((1001, 1, 'score', 101, 11,
+                             '2020-01-01T00:00:00Z'))
+            writer.writerow((1002, 9999, 'title', 102, 5,
+                             '2020-01-01T00:00:00Z'))
+            writer.writerow((1003, 1, 'date', 103, 5, 'вчера'))
+        with pytest.raises(CommandError) as exc_info:
+            run_import('--path', str(tmp_path), '--workers', workers)
+        message = str(exc_info.value)
+        for line in (3, 4, 5):
+            assert f'review.csv, строка {line}' in message, (
+                'Проверьте, что импорт сообщает о всех некорректных строках '
+                'пачки.'
+            )
+        assert 'строка 2' not in message
+        assert not Review.objects.filter(pk=1000).exists()
+
+    def test_08_cache_versions(self, client, tmp_path):
+        for filename in ('users.csv', 'category.csv', 'genre.csv',
+                         'titles.csv', 'genre_title.csv'):
+            shutil.copy(DATA_PATH / filename, tmp_path)
+        run_import('--path', str(tmp_path))
+        url = '/api/v1/titles/1/reviews/'
+        assert client.get(url).json()['count'] == 0
+        cache.set('unrelated', 'value')
+
+        run_import()
+        assert client.get(url).json()['count'] == (
+            Review.objects.filter(title_id=1).count()) > 0, (
+            'Проверьте, что импорт сбрасывает кэш ответов изменённых '
+            'ресурсов.'
+        )
+        assert cache.get('unrelated') == 'value', (
+            'Проверьте, что импорт не очищает кэш целиком.'
+        )
+
+    def test_09_other_caches_reset(self, client, tmp_path, django_user_model):
+        with open(tmp_path / 'category.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            file.write('id,name,slug\n50,Новая,newcat\n')
+        url = '/api/v1/titles/?category=newcat'
+        assert client.get(url).status_code == 400
+        run_import('--path', str(tmp_path))
+        assert client.get(url).status_code == 200, (
+            'Проверьте, что импорт сбрасывает кэш слагов для фильтров.'
+        )
+
+        admin = django_user_model.objects.create(
+            id=500, username='imported', email='imported@yamdb.fake',
+            role='admin')
+        admin_client = APIClient()
+        admin_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(admin)}')
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        with open(tmp_path / 'users.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            file.write('id,username,email,role,bio,first_name,last_name\n'
+                       '500,imported,imported@yamdb.fake,user,,,\n')
+        run_import('--path', str(tmp_path), '--update')
+        assert admin_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что импорт пользователей сбрасывает их состояние '
+            'в кэше аутентификации.'
+        )
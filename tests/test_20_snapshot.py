@@ -0,0 +1,109 @@
+import ast
+import json
+import struct
+from array import array
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews import snapshot
+from reviews.models import Review, Title
+
+NPY_TYPECODES = {'<i8': 'q', '<i4': 'i', '|i1': 'b', '|b1': 'B',
+                 '<f8': 'd', '<M8[us]': 'q', '|u1': 'B'}
+
+
+def load_npy(path):
+    """Минимальное чтение .npy без numpy: заголовок и данные."""
+    with open(path, 'rb') as file:
+        assert file.read(8) == b'\x93NUMPY\x01\x00'
+        size, = struct.unpack('<H', file.read(2))
+        header = ast.literal_eval(file.read(size).decode('latin1'))
+        values = array(NPY_TYPECODES[header['descr']])
+        values.frombytes(file.read())
+    assert header['shape'] == (len(values),)
+    return values
+
+
+def load_strings(directory, table, column):
+    offsets = load_npy(directory / table / f'{column}.offsets.npy')
+    data = load_npy(directory / table / f'{column}.data.npy').tobytes()
+    return [data[start:end].decode()
+            for start, end in zip(offsets, offsets[1:])]
+
+
+def export(*args):
+    call_command('import_yamdb', stdout=StringIO())
+    call_command('export_snapshot', *args, stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Snapshot:
+
+    def test_01_npy(self, tmp_path):
+        export(str(tmp_path), '--format', 'npy', '--chunk-size', '7')
+        manifest = json.loads((tmp_path / 'manifest.json').read_text())
+        assert manifest['format'] == 'npy'
+        assert manifest['tables']['reviews']['rows'] == Review.objects.count()
+
+        reviews = list(Review.objects.order_by('pk'))
+        assert list(load_npy(tmp_path / 'reviews' / 'id.npy')) == [
+            review.pk for review in reviews]
+        assert list(load_npy(tmp_path / 'reviews' / 'score.npy')) == [
+            review.score for review in reviews]
+        assert load_strings(tmp_path, 'reviews', 'text') == [
+            review.text for review in reviews], (
+            'Проверьте, что строки сохраняются смещениями и байтами UTF-8.'
+        )
+        pub_dates = load_npy(tmp_path / 'reviews' / 'pub_date.npy')
+        assert pub_dates[0] == int(reviews[0].pub_date.timestamp() * 10 ** 6)
+
+        titles = list(Title.objects.order_by('pk'))
+        ratings = load_npy(tmp_path / 'titles' / 'rating.npy')
+        for title, rating in zip(titles, ratings):
+            if title.rating is None:
+                assert rating != rating
+            else:
+                assert rating == title.rating
+
+    def test_02_single_transaction(self, tmp_path, monkeypatch):
+        export_table = snapshot.export_table
+        atomic = []
+
+        def recording_export_table(*args, **kwargs):
+            atomic.append(connection.in_atomic_block)
+            return export_table(*args, **kwargs)
+
+        monkeypatch.setattr(snapshot, 'export_table', recording_export_table)
+        export(str(tmp_path), '--format', 'npy')
+        assert atomic and all(atomic), (
+            'Проверьте, что все таблицы выгружаются в одной транзакции.'
+        )
+
+    def test_03_no_secrets(self, tmp_path):
+        export(str(tmp_path), '--format', 'npy')
+        columns = json.loads(
+            (tmp_path / 'manifest.json').read_text()
+        )['tables']['users']['columns']
+        assert 'password' not in columns and 'email' not in columns, (
+            'Проверьте, что в снимок не попадают пароли и email.'
+        )
+        assert not list(tmp_path.glob('users/password*'))
+
+    def test_04_numpy_mmap(self, tmp_path):
+        numpy = pytest.importorskip('numpy')
+        export(str(tmp_path), '--format', 'npy')
+        scores = numpy.load(tmp_path / 'reviews' / 'score.npy',
+                            mmap_mode='r')
+        assert scores.dtype == numpy.int8
+        assert len(scores) == Review.objects.count()
+
+    def test_05_parquet(self, tmp_path):
+        parquet = pytest.importorskip('pyarrow.parquet')
+        export(str(tmp_path), '--format', 'parquet')
+        table = parquet.read_table(tmp_path / 'reviews.parquet')
+        assert table.num_rows == Review.objects.count()
+        assert table.column('score').to_pylist() == list(
+            Review.objects.order_by('pk').values_list('score', flat=True))
@@ -0,0 +1,94 @@
+import csv
+import shutil
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import CatalogRowHash, Title, TitleGenre
+
+DATA_PATH = settings.BASE_DIR / 'static' / 'data'
+
+
+def run_sync(path):
+    out = StringIO()
+    call_command('import_yamdb', '--path', str(path), '--sync', stdout=out)
+    return out.getvalue()
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.reader(file))
+
+
+def write_rows(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        csv.writer(file).writerows(rows)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21CatalogSync:
+
+    @pytest.fixture
+    def catalog(self, tmp_path):
+        for filename in ('category.csv', 'genre.csv', 'titles.csv',
+                         'genre_title.csv'):
+            shutil.copy(DATA_PATH / filename, tmp_path)
+        return tmp_path
+
+    def test_01_first_sync(self, catalog):
+        output = run_sync(catalog)
+        titles = len(read_rows(catalog / 'titles.csv')) - 1
+        assert Title.objects.count() == titles
+        assert CatalogRowHash.objects.filter(
+            source='titles.csv').count() == titles, (
+            'Проверьте, что синхронизация сохраняет хэши строк.'
+        )
+        assert f'titles.csv: создано {titles}' in output
+
+    def test_02_unchanged(self, catalog):
+        run_sync(catalog)
+        with CaptureQueriesContext(connection) as context:
+            output = run_sync(catalog)
+        writes = [query['sql'] for query in context.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        assert not writes, (
+            'Проверьте, что неизменённые строки не перезаписываются.'
+        )
+        assert 'titles.csv: создано 0, обновлено 0' in output
+
+    def test_03_delta(self, catalog):
+        run_sync(catalog)
+        rows = read_rows(catalog / 'titles.csv')
+        header, first, removed = rows[0], rows[1], rows[2]
+        first[1] = 'Новое название'
+        new = ['1000', 'Новое произведение', '2020', '1', '']
+        write_rows(catalog / 'titles.csv',
+                   [header, first, *rows[3:], new])
+        links = read_rows(catalog / 'genre_title.csv')
+        write_rows(catalog / 'genre_title.csv', [
+            row for row in links if row[1] != removed[0]])
+
+        output = run_sync(catalog)
+        assert 'titles.csv: создано 1, обновлено 1' in output
+        assert 'titles.csv: удалено 1' in output
+        assert Title.objects.get(pk=first[0]).name == 'Новое название'
+        assert Title.objects.filter(pk=1000).exists()
+        assert not Title.objects.filter(pk=removed[0]).exists(), (
+            'Проверьте, что пропавшие из файла строки удаляются.'
+        )
+        assert not TitleGenre.objects.filter(titles_id=removed[0]).exists()
+        assert not CatalogRowHash.objects.filter(
+            source='titles.csv', row_id=removed[0]).exists()
+
+    def test_04_keeps_other_titles(self, catalog):
+        run_sync(catalog)
+        title = Title.objects.create(name='Добавлено через API', year=2000)
+        run_sync(catalog)
+        assert Title.objects.filter(pk=title.pk).exists(), (
+            'Проверьте, что синхронизация не удаляет записи, которые не '
+            'приходили из файла.'
+        )
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+def selects_from(context, table):
+    return [query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(f'SELECT "{table}"')]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NestedParents:
+
+    def test_01_review_of_other_title(self, client, admin_client, admin,
+                                      user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        base = f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}'
+        urls = (f'{base}/comments/', f'{base}/comments/{comments[0]["id"]}/')
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 404, (
+                'Проверьте, что отзыв чужого произведения в URL '
+                f'`{url}` возвращает статус 404.'
+            )
+        response = user_client.post(urls[0], data={'text': 'Комментарий'})
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя прокомментировать отзыв через URL '
+            'чужого произведения.'
+        )
+
+    def test_02_review_create_loads_title_once(self, admin_client,
+                                               user_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        assert len(selects_from(context, 'reviews_title')) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'из БД один раз.'
+        )
+
+    def test_03_comment_create_loads_parents_once(self, admin_client, admin,
+                                                  user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/comments/',
+                data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert len(selects_from(context, 'reviews_review')) == 1, (
+            'Проверьте, что отзыв и произведение загружаются одним запросом.'
+        )
+        assert not selects_from(context, 'reviews_title')
@@ -0,0 +1,92 @@
+import logging
+
+import pytest
+from django.core.cache import cache
+
+from api.middleware import QueryBudgetExceeded, fingerprint
+from api.v1.views import TitlesViewSet
+from reviews.models import Genre, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23QueryBudget:
+
+    @pytest.fixture
+    def tight_budget(self, monkeypatch):
+        monkeypatch.setattr(TitlesViewSet, 'query_budget', {'list': 1})
+
+    def test_01_strict_raises(self, client, admin_client, tight_budget):
+        titles, _, _ = create_titles(admin_client)
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/api/v1/titles/')
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 200, (
+            'Проверьте, что действия без бюджета не проверяются.'
+        )
+
+    def test_02_warning(self, client, admin_client, tight_budget, settings,
+                        caplog):
+        create_titles(admin_client)
+        settings.QUERY_BUDGET_STRICT = False
+        with caplog.at_level(logging.WARNING, logger='api.query_budget'):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        records = [record for record in caplog.records
+                   if record.name == 'api.query_budget']
+        assert len(records) == 1, (
+            'Проверьте, что без строгого режима превышение бюджета '
+            'записывается в лог.'
+        )
+        record = records[0]
+        assert record.query_budget == 1
+        assert record.queries > 1
+        assert record.db_time_ms >= 0
+        assert record.fingerprints and all(
+            {'sql', 'count'} <= set(item) for item in record.fingerprints)
+
+    def test_03_streaming_skipped(self, client, admin_client, tight_budget):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?stream=1')
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что потоковые ответы не проверяются бюджетом.'
+        )
+        b''.join(response.streaming_content)
+
+    def test_04_server_error_skipped(self, client, admin_client,
+                                     tight_budget, monkeypatch):
+        create_titles(admin_client)
+
+        def broken_list(view, request, *args, **kwargs):
+            list(Title.objects.all())
+            list(Genre.objects.all())
+            raise RuntimeError('Ошибка во вьюсете')
+
+        monkeypatch.setattr(TitlesViewSet, 'list', broken_list)
+        with pytest.raises(RuntimeError):
+            client.get('/api/v1/titles/')
+
+    def test_05_filters_and_facets(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        category, genre = categories[0]['slug'], genres[0]['slug']
+        facets = 'facets=genre,category,year'
+        for query in (
+            f'category={category}&genre={genre}&{facets}',
+            f'category__in={category}&genre__in={genre},{genres[1]["slug"]}'
+            f'&year=1984&search=Тер&{facets}',
+            f'cursor=&category={category}&genre={genre}&{facets}',
+        ):
+            cache.clear()
+            response = admin_client.get(f'/api/v1/titles/?{query}')
+            assert response.status_code == 200, (
+                'Проверьте, что бюджет запросов списка произведений '
+                f'учитывает фильтры и фасеты: `?{query}`.'
+            )
+
+    def test_06_fingerprint(self):
+        assert fingerprint(
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s)\n'
+            "  AND \"a\".\"name\" = 'x' LIMIT 21"
+        ) == ('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, ...) '
+              'AND "a"."name" = ? LIMIT ?')
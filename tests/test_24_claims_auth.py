@@ -0,0 +1,117 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.authentication import access_token_for, user_state_key
+from api.v1.cache import bump_version
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ClaimsAuth:
+
+    def test_01_token_claims(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        token = AccessToken(response.json()['token'])
+        assert token['username'] == user.username
+        assert token['role'] == user.role, (
+            'Проверьте, что токен содержит роль пользователя.'
+        )
+        assert token['is_superuser'] is False
+
+    def test_02_no_auth_queries(self, user, django_assert_num_queries):
+        user_client = client_for(access_token_for(user))
+        user_client.get('/api/v1/categories/')
+        bump_version('categories')
+        # Только COUNT пустого списка - как для анонима.
+        with django_assert_num_queries(1):
+            response = user_client.get('/api/v1/categories/')
+        assert response.status_code == 200, (
+            'Проверьте, что пользователь собирается из кэша без '
+            'запросов к БД.'
+        )
+
+    def test_03_role_change(self, user):
+        user_client = client_for(access_token_for(user))
+        data = {'name': 'Категория', 'slug': 'category'}
+        response = user_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 403
+        user.role = 'admin'
+        user.save()
+        response = user_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что смена роли действует на уже выданные токены.'
+        )
+
+    def test_04_token_without_claims(self, user, django_assert_num_queries):
+        user_client = client_for(AccessToken.for_user(user))
+        cache.clear()
+        # Пользователь из БД, COUNT.
+        with django_assert_num_queries(2):
+            user_client.get('/api/v1/categories/')
+        # Пользователь из кэша, ответ из кэша.
+        with django_assert_num_queries(0):
+            user_client.get('/api/v1/categories/')
+
+    def test_05_deleted_user(self, user):
+        user_client = client_for(access_token_for(user))
+        user.delete()
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+    def test_06_me_full_row(self, user):
+        user_client = client_for(access_token_for(user))
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['email'] == user.email
+        assert data['bio'] == user.bio
+
+    def test_07_revoked_after_cache_clear(self, admin):
+        admin_client = client_for(access_token_for(admin))
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.is_superuser = admin.is_staff = False
+        admin.save()
+        cache.clear()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 403, (
+            'Проверьте, что права из токена не используются, если '
+            'состояния пользователя нет в кэше.'
+        )
+        admin.delete()
+        cache.clear()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 401
+
+    def test_08_short_state_timeout(self, user, monkeypatch):
+        user_client = client_for(access_token_for(user))
+        timeouts = []
+
+        add = cache.add
+
+        def recording_add(key, value, timeout=None, **kwargs):
+            if key == user_state_key(user.pk):
+                timeouts.append(timeout)
+            return add(key, value, timeout, **kwargs)
+
+        cache.clear()
+        monkeypatch.setattr(cache, 'add', recording_add)
+        user_client.get('/api/v1/users/me/')
+        assert timeouts and all(0 < timeout <= 60 for timeout in timeouts), (
+            'Проверьте, что состояние пользователя кэшируется на секунды, '
+            'а не на время жизни токена.'
+        )
@@ -0,0 +1,132 @@
+import threading
+import warnings
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+from users.outbox import MAX_ATTEMPTS, enqueue_email
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise SMTPException('Сервер недоступен')
+
+
+def send_outbox(*args):
+    out = StringIO()
+    call_command('send_outbox', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def smtp_server():
+    """Локальный отладочный SMTP-сервер из стандартной библиотеки."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        asyncore = pytest.importorskip('asyncore')
+        smtpd = pytest.importorskip('smtpd')
+
+    class Server(smtpd.SMTPServer):
+        messages = []
+
+        def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+            self.messages.append((peer, rcpttos))
+
+    server = Server(('127.0.0.1', 0), None)
+    thread = threading.Thread(
+        target=asyncore.loop, kwargs={'timeout': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.close()
+    thread.join(timeout=5)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Outbox:
+
+    def test_01_signup_enqueues(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        sent_before = len(mail.outbox)
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'})
+        assert response.status_code == 200
+        assert len(mail.outbox) == sent_before, (
+            'Проверьте, что регистрация не отправляет письмо в запросе.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.to == 'valid@yamdb.fake' and email.sent is None
+
+        assert 'Отправлено 1, ошибок 0' in send_outbox()
+        assert len(mail.outbox) == sent_before + 1
+        assert mail.outbox[-1].to == ['valid@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent is not None
+        assert send_outbox() == '', (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_retry_with_backoff(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_BACKEND = 'tests.test_25_outbox.FailingBackend'
+        email = enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        assert 'Отправлено 0, ошибок 1' in send_outbox()
+        email.refresh_from_db()
+        assert email.attempts == 1
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается.'
+        )
+        assert 'SMTPException' in email.last_error
+        assert send_outbox() == ''
+
+        OutboxEmail.objects.update(attempts=MAX_ATTEMPTS,
+                                   send_after=timezone.now())
+        assert send_outbox() == '', (
+            'Проверьте, что после последней попытки письмо не отправляется.'
+        )
+
+    def test_03_one_connection_per_batch(self, settings, smtp_server):
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        host, port = smtp_server.socket.getsockname()
+        settings.EMAIL_HOST, settings.EMAIL_PORT = host, port
+        for number in range(5):
+            enqueue_email('Тема', 'Текст', f'user{number}@yamdb.fake')
+        assert 'Отправлено 5, ошибок 0' in send_outbox('--batch-size', '3')
+        assert sorted(to for _, (to,) in smtp_server.messages) == [
+            f'user{number}@yamdb.fake' for number in range(5)]
+        connections = {peer for peer, _ in smtp_server.messages}
+        assert len(connections) == 2, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+
+    def test_04_body_erased_and_purged(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        sent = enqueue_email('Тема', 'Код: 123456', 'sent@yamdb.fake')
+        send_outbox()
+        sent.refresh_from_db()
+        assert sent.sent is not None and sent.body == '', (
+            'Проверьте, что после отправки текст письма с кодом стирается.'
+        )
+        failed = enqueue_email('Тема', 'Код', 'failed@yamdb.fake')
+        waiting = enqueue_email('Тема', 'Код', 'waiting@yamdb.fake')
+        long_ago = timezone.now() - timedelta(days=8)
+        OutboxEmail.objects.filter(pk=sent.pk).update(sent=long_ago)
+        OutboxEmail.objects.filter(pk=failed.pk).update(
+            attempts=MAX_ATTEMPTS, created=long_ago)
+        OutboxEmail.objects.filter(pk=waiting.pk).update(
+            created=long_ago, send_after=timezone.now() + timedelta(hours=1))
+
+        assert 'Удалено старых писем: 2' in send_outbox()
+        assert list(OutboxEmail.objects.values_list('pk', flat=True)) == [
+            waiting.pk], (
+            'Проверьте, что `send_outbox` удаляет старые отправленные и '
+            'исчерпавшие попытки письма, но не письма в очереди.'
+        )
@@ -0,0 +1,77 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from api.v1.serializers import SignupSerializer
+from users.bloom import user_filters
+
+DATA = {'username': 'valid_username', 'email': 'valid@yamdb.fake'}
+
+
+def user_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if '"users_user"' in query['sql']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Signup:
+
+    def test_01_single_lookup(self, client):
+        user_filters.get_filters()
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/signup/', data=DATA)
+        assert response.status_code == 200
+        queries = user_queries(context)
+        assert len(queries) == 1 and queries[0].startswith('INSERT'), (
+            'Проверьте, что регистрация нового пользователя сразу делает '
+            'вставку без поиска.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/signup/', data=DATA)
+        assert response.status_code == 200
+        assert len(user_queries(context)) == 1, (
+            'Проверьте, что повторная регистрация не ищет пользователя '
+            'повторно.'
+        )
+
+    def test_02_conflicts(self, client, django_user_model):
+        django_user_model.objects.create(**DATA)
+        response = client.post('/api/v1/auth/signup/', data={
+            **DATA, 'email': 'other@yamdb.fake'})
+        assert response.status_code == 400
+        assert 'username' in response.json()
+        response = client.post('/api/v1/auth/signup/', data={
+            **DATA, 'username': 'other'})
+        assert response.status_code == 400
+        assert 'email' in response.json()
+
+    def test_03_concurrent_same_user(self, django_user_model):
+        serializer = SignupSerializer(data=DATA)
+        assert serializer.is_valid()
+        existing = django_user_model.objects.create(**DATA)
+        assert serializer.save().pk == existing.pk, (
+            'Проверьте, что параллельная регистрация с теми же данными '
+            'возвращает уже созданного пользователя.'
+        )
+
+    def test_04_concurrent_conflict(self, django_user_model):
+        serializer = SignupSerializer(data=DATA)
+        assert serializer.is_valid()
+        django_user_model.objects.create(username='other',
+                                         email=DATA['email'])
+        with pytest.raises(ValidationError):
+            serializer.save()
+        assert django_user_model.objects.count() == 1
+
+    def test_05_token_single_lookup(self, client, django_user_model):
+        user = django_user_model.objects.create(**DATA)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/token/', data={
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user),
+            })
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from users.bloom import BloomFilter, user_filters
+
+DATA = {'username': 'valid_username', 'email': 'valid@yamdb.fake'}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27SignupFilters:
+
+    def test_01_bloom_filter(self):
+        bloom = BloomFilter(1000)
+        for number in range(1000):
+            bloom.add(f'user{number}')
+        assert all(f'user{number}' in bloom for number in range(1000)), (
+            'Проверьте, что фильтр Блума не даёт ложноотрицательных ответов.'
+        )
+        false_positives = sum(f'other{number}' in bloom
+                              for number in range(10000))
+        assert false_positives / 10000 < 0.03
+        assert 0.005 < bloom.expected_error_rate < 0.02
+
+    def test_02_user_from_other_process(self, client, django_user_model):
+        user_filters.get_filters()
+        # bulk_create не шлёт сигналов - как запись из другого процесса.
+        django_user_model.objects.bulk_create([django_user_model(**DATA)])
+        response = client.post('/api/v1/auth/signup/', data=DATA)
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация пользователя, которого нет в '
+            'фильтре, находит его после ошибки уникальности.'
+        )
+        response = client.post('/api/v1/auth/signup/', data={
+            **DATA, 'email': 'other@yamdb.fake'})
+        assert response.status_code == 400
+        assert django_user_model.objects.count() == 1
+
+    def test_03_stats(self, client, user_superuser_client,
+                      django_user_model):
+        client.post('/api/v1/auth/signup/', data=DATA)
+        client.post('/api/v1/auth/signup/', data=DATA)
+        user = django_user_model.objects.get(username=DATA['username'])
+        user.delete()
+        client.post('/api/v1/auth/signup/', data=DATA)
+
+        response = client.get('/api/v1/auth/signup/stats/')
+        assert response.status_code == 401
+        response = user_superuser_client.get('/api/v1/auth/signup/stats/')
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats['checks'] == 3
+        assert stats['lookups'] == 2
+        assert stats['false_positives'] == 1, (
+            'Проверьте, что срабатывание фильтра без пользователя в БД '
+            'считается ложноположительным.'
+        )
+        assert stats['false_positive_rate'] == 0.5
+        assert 0 <= stats['expected_false_positive_rate'] < 0.01
@@ -0,0 +1,41 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from reviews.sqlite import pragma_statements
+
+
+def pragmas(*names):
+    # Тестовая БД в памяти не закрывает основное соединение, поэтому
+    # прагмы проверяются на новом.
+    connection = connections.create_connection('default')
+    try:
+        with connection.cursor() as cursor:
+            return [cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                    for name in names]
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SqlitePragmas:
+
+    def test_01_new_connection(self, settings):
+        settings.SQLITE_PRAGMAS = {'busy_timeout': 1234,
+                                   'temp_store': 'MEMORY'}
+        assert pragmas('busy_timeout', 'temp_store') == [1234, 2], (
+            'Проверьте, что прагмы из `SQLITE_PRAGMAS` выполняются при '
+            'открытии соединения.'
+        )
+
+    def test_02_empty_profile(self, settings):
+        settings.SQLITE_PRAGMAS = {}
+        assert pragmas('temp_store') == [0]
+
+    def test_03_invalid_pragma(self):
+        assert pragma_statements({'cache_size': -64000}) == [
+            'PRAGMA cache_size = -64000']
+        for pragmas in ({'cache_size; DROP TABLE x': 1},
+                        {'journal_mode': 'WAL; DROP TABLE x'}):
+            with pytest.raises(ImproperlyConfigured):
+                pragma_statements(pragmas)